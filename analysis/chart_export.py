@@ -0,0 +1,135 @@
+"""
+Chart Data Export
+Writes compact, pre-aggregated JSON series for the static portfolio pages so
+charts can be drawn client-side (js/charts.js) instead of shipping 150-dpi PNGs.
+Long daily series are downsampled with LTTB (Largest-Triangle-Three-Buckets),
+which keeps the visual shape (peaks, troughs) with a few hundred points.
+"""
+
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'str_reports'))
+
+from str_store import load_store, store_exists, list_markets
+from swap_schema import FEE_RATES
+
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'assets', 'data')
+SAMPLE_FILE = os.path.join(PROJECT_ROOT, 'Data', 'uniswap_sample_data.csv')
+BIG_DATA_FILE = os.path.join(PROJECT_ROOT, 'Data', 'uniswap_large_transactions.csv')
+POOLS = {
+    '0.05%': '0x88e6a0c2ddd26feeb64f039a2c41296fcb3f5640',
+    '0.3%': '0x8ad599c3a0eb1ed45050bb3064a26174943575c3'
+}
+MAX_POINTS = 240
+
+def lttb(x, y, threshold):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def series(name, dates, values, threshold=MAX_POINTS, digits=2):
+    """One named series, LTTB-downsampled, with ISO date labels"""
+    dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+    values = pd.Series(values, dtype=np.float64).reset_index(drop=True)
+    valid = values.notna().to_numpy()
+    dates, values = dates[valid].reset_index(drop=True), values[valid].reset_index(drop=True)
+
+    day_number = (dates - pd.Timestamp('1970-01-01')).dt.total_seconds().to_numpy() / 86400
+    kept = lttb(day_number, values.to_numpy(), threshold)
+    return {
+        'name': name,
+        'x': dates.iloc[kept].dt.strftime('%Y-%m-%d').tolist(),
+        'y': [round(float(v), digits) for v in values.iloc[kept]],
+    }
+
+def write_chart(filename, title, unit, series_list):
+    """Write one chart spec as compact JSON"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(OUTPUT_DIR, filename)
+    with open(path, 'w') as f:
+        json.dump({'title': title, 'unit': unit, 'series': series_list}, f, separators=(',', ':'))
+    print(f"✓ {filename}: {sum(len(s['x']) for s in series_list)} points, {os.path.getsize(path):,} bytes")
+    return path
+
+def export_str_charts():
+    """Daily occupancy vs compset (731 days) and monthly STR indices per market"""
+    if not store_exists():
+        print("STR store not found, skipping STR charts")
+        return []
+
+    paths = []
+    for market in list_markets('daily'):
+        daily = load_store('daily', market=market, columns=['date', 'occupancy', 'compset_occupancy'])
+        daily = daily.sort_values('date')
+        # 7-day rolling mean smooths day-of-week noise before downsampling
+        rolling = daily.set_index('date').rolling('7D').mean()
+        paths.append(write_chart(f"{market}_daily_occupancy.json", f"{market.title()} - Daily Occupancy (7-day avg)", '%', [
+            series('Your Property', rolling.index, rolling['occupancy'], digits=1),
+            series('Competitive Set', rolling.index, rolling['compset_occupancy'], digits=1),
+        ]))
+
+        monthly = load_store('monthly', market=market, columns=['year', 'month', 'mpi', 'ari', 'rgi'])
+        month_start = pd.to_datetime(dict(year=monthly['year'], month=monthly['month'], day=1))
+        paths.append(write_chart(f"{market}_str_indices.json", f"{market.title()} - STR Indices", 'index', [
+            series(metric.upper(), month_start, monthly[metric], digits=1) for metric in ['mpi', 'ari', 'rgi']
+        ]))
+    return paths
+
+def export_web3_charts():
+    """7-day rolling LP APR per pool, and daily protocol revenue from the big dataset"""
+    paths = []
+    df_all = pd.read_csv(SAMPLE_FILE, parse_dates=['date'])
+    apr_series = []
+    for tier, address in POOLS.items():
+        df = df_all[df_all['pool_id'] == address].sort_values('date')
+        if df.empty:
+            continue
+        apr = (df['feesUSD'] / df['tvlUSD'] * 365 * 100).rolling(window=7).mean()
+        apr_series.append(series(f"Fee Tier {tier}", df['date'], apr))
+    paths.append(write_chart('web3_apr.json', 'Liquidity Provider Profitability (7-Day Rolling APR)', '%', apr_series))
+
+    if os.path.exists(BIG_DATA_FILE):
+        revenue = []
+        for chunk in pd.read_csv(BIG_DATA_FILE, usecols=['timestamp', 'amount_usd', 'fee_tier'],
+                                 parse_dates=['timestamp'], chunksize=1_000_000):
+            chunk['revenue'] = chunk['amount_usd'] * chunk['fee_tier'].map(FEE_RATES)
+            revenue.append(chunk.groupby([chunk['timestamp'].dt.floor('D'), 'fee_tier'])['revenue'].sum())
+        daily = pd.concat(revenue).groupby(level=[0, 1]).sum().unstack(fill_value=0)
+        paths.append(write_chart('web3_daily_revenue.json', 'Daily Protocol Revenue by Fee Tier', 'USD', [
+            series(f"Fee Tier {tier}", daily.index, daily[tier]) for tier in daily.columns
+        ]))
+    else:
+        print(f"{BIG_DATA_FILE} not found, skipping big data revenue chart")
+    return paths
+
+if __name__ == "__main__":
+    print("📦 Exporting chart data...")
+    export_str_charts()
+    export_web3_charts()
+    print(f"\n✅ Chart data saved to {OUTPUT_DIR}")
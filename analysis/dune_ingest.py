@@ -0,0 +1,211 @@
+"""
+Dune Export Ingest
+Merges chunked Dune CSV exports (analysis/dune_query.sql is capped at
+LIMIT 100000 per download) into the time-sorted transaction store read by
+uniswap_big_data.py, deduplicating swaps on tx_hash.
+
+The dedupe index is a sorted array of 64-bit hashes of every stored hash
+(8 bytes per row, Data/uniswap_large_transactions.csv.idx.npy) plus a small
+JSON sidecar with the store's size, mtime and latest timestamp. Export files
+are streamed in chunks; each chunk is hashed and probed with searchsorted, so
+re-ingesting an overlapping export only costs hashing it, and only unseen rows
+are written. New rows that are all newer than the store are appended.
+
+A backfill (any new row older than the store's latest timestamp) rewrites the
+whole store: it is merged with the new rows chunk by chunk into a temp file
+that then replaces it, so memory stays at about one chunk and an interrupted
+run leaves the store intact, but the cost grows with the store, not with the
+new rows. dune_query.sql exports the newest 100,000 swaps (ORDER BY timestamp
+DESC LIMIT 100000), so exports pulled for earlier days are backfills.
+Amounts are parsed round-trip exact, so stored values are rewritten digit for
+digit.
+
+Usage:
+    python analysis/dune_ingest.py exports/dune_*.csv
+    python analysis/dune_ingest.py chunk1.csv chunk2.csv --store Data/uniswap_large_transactions.csv
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_FILE = os.path.join(PROJECT_ROOT, 'Data', 'uniswap_large_transactions.csv')
+
+STORE_COLUMNS = ['transaction_hash', 'timestamp', 'amount_usd', 'fee_tier', 'gas_cost_usd', 'slippage_impact']
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+CHUNK_ROWS = 250_000
+
+# Dune export column -> store column
+DUNE_COLUMNS = {
+    'tx_hash': 'transaction_hash',
+    'timestamp': 'timestamp',
+    'block_time': 'timestamp',
+    'amount_usdc': 'amount_usd',
+    'amount_usd': 'amount_usd',
+    'gas_cost_usd': 'gas_cost_usd',
+    'fee_tier': 'fee_tier',
+}
+
+def hash_keys(values):
+    """64-bit hashes of transaction hashes (case-insensitive)"""
+    keys = pd.Series(values, dtype=object).str.lower()
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+def index_paths(store):
+    return store + '.idx.npy', store + '.idx.json'
+
+def _store_stamp(store):
+    stat = os.stat(store)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def build_index(store, chunk_rows=CHUNK_ROWS):
+    """Scan the store once for its hash index and latest timestamp"""
+    hashes, latest = [], None
+    for chunk in pd.read_csv(store, usecols=['transaction_hash', 'timestamp'], chunksize=chunk_rows):
+        hashes.append(hash_keys(chunk['transaction_hash']))
+        chunk_latest = chunk['timestamp'].max()
+        latest = chunk_latest if latest is None else max(latest, chunk_latest)
+    index = np.sort(np.concatenate(hashes)) if hashes else np.empty(0, dtype=np.uint64)
+    return index, latest
+
+def save_index(store, index, latest):
+    index_file, meta_file = index_paths(store)
+    np.save(index_file, index)
+    with open(meta_file, 'w') as f:
+        json.dump({'rows': int(len(index)), 'latest': latest, **_store_stamp(store)}, f)
+
+def load_index(store):
+    """Sorted hash index and latest timestamp, rebuilt if the store changed since it was saved"""
+    if not os.path.exists(store):
+        return np.empty(0, dtype=np.uint64), None
+    index_file, meta_file = index_paths(store)
+    if os.path.exists(index_file) and os.path.exists(meta_file):
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if {k: meta.get(k) for k in ('size', 'mtime')} == _store_stamp(store):
+            return np.load(index_file), meta['latest']
+    print(f"Building hash index for {store}...")
+    index, latest = build_index(store)
+    save_index(store, index, latest)
+    return index, latest
+
+def contains(sorted_keys, keys):
+    """Membership of `keys` in a sorted hash array"""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[pos] == keys
+
+def normalize_export(chunk):
+    """Map a Dune export chunk onto the store schema"""
+    df = chunk.rename(columns={c: DUNE_COLUMNS[c] for c in chunk.columns if c in DUNE_COLUMNS})
+    missing = {'transaction_hash', 'timestamp'} - set(df.columns)
+    if missing:
+        raise ValueError(f"Export is missing required columns: {sorted(missing)}")
+
+    out = pd.DataFrame({'transaction_hash': df['transaction_hash'].astype(str).str.lower()})
+    out['timestamp'] = pd.to_datetime(df['timestamp'], utc=True).dt.tz_convert(None).dt.strftime(TIMESTAMP_FORMAT)
+    # Swap amounts are signed (pool in/out); volume is the absolute USDC leg
+    out['amount_usd'] = _numeric(df, 'amount_usd').abs()
+    out['fee_tier'] = df['fee_tier'] if 'fee_tier' in df.columns else '0.05%'
+    out['gas_cost_usd'] = _numeric(df, 'gas_cost_usd')
+    out['slippage_impact'] = _numeric(df, 'slippage_impact')
+    return out[STORE_COLUMNS]
+
+def _numeric(df, column):
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce')
+
+def merge_into_store(store, new_rows, chunk_rows=CHUNK_ROWS):
+    """Backfill: merge time-sorted `new_rows` into the store chunk by chunk.
+
+    The merged store is streamed to a temp file that replaces the store only
+    once it is complete, so an interrupted backfill leaves the store intact.
+    Stored rows come before new rows with the same timestamp.
+    """
+    tmp_path = store + '.tmp'
+    pending = new_rows
+    try:
+        chunks = pd.read_csv(store, dtype={'timestamp': str}, chunksize=chunk_rows, float_precision='round_trip')
+        for i, chunk in enumerate(chunks):
+            if len(pending) and len(chunk):
+                # New rows before this chunk's last timestamp can't follow anything in later chunks
+                cut = int(np.searchsorted(pending['timestamp'].to_numpy(), chunk['timestamp'].iat[-1], side='left'))
+                if cut:
+                    chunk = pd.concat([chunk, pending.iloc[:cut]], ignore_index=True)
+                    chunk = chunk.sort_values('timestamp', kind='stable')
+                    pending = pending.iloc[cut:]
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        pending.to_csv(tmp_path, mode='a', header=False, index=False)
+        os.replace(tmp_path, store)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def ingest(export_files, store=STORE_FILE, chunk_rows=CHUNK_ROWS):
+    """Stream export files into the store, skipping tx hashes already present.
+
+    Returns a dict with rows read, rows added and whether the store was
+    appended to or rewritten.
+    """
+    index, latest = load_index(store)
+    ingested = np.empty(0, dtype=np.uint64)
+    new_frames, stats = [], {'read': 0, 'added': 0, 'mode': 'none'}
+
+    for path in export_files:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, float_precision='round_trip'):
+            rows = normalize_export(chunk)
+            stats['read'] += len(rows)
+
+            # Drop duplicates within the chunk, then anything already stored or ingested
+            keys, first = np.unique(hash_keys(rows['transaction_hash']), return_index=True)
+            fresh = ~(contains(index, keys) | contains(ingested, keys))
+            if fresh.any():
+                new_frames.append(rows.iloc[first[fresh]])
+                ingested = np.union1d(ingested, keys[fresh])
+
+    if not new_frames:
+        return stats
+
+    new_rows = pd.concat(new_frames, ignore_index=True).sort_values('timestamp', kind='stable')
+    stats['added'] = len(new_rows)
+    os.makedirs(os.path.dirname(store) or '.', exist_ok=True)
+
+    if latest is None or not os.path.exists(store):
+        new_rows.to_csv(store, index=False)
+        stats['mode'] = 'create'
+    elif new_rows['timestamp'].iloc[0] >= latest:
+        new_rows.to_csv(store, mode='a', header=False, index=False)
+        stats['mode'] = 'append'
+    else:
+        merge_into_store(store, new_rows, chunk_rows)
+        stats['mode'] = 'rewrite'
+
+    all_keys = np.sort(np.concatenate([index, ingested]))
+    new_latest = max(latest or '', new_rows['timestamp'].iloc[-1])
+    save_index(store, all_keys, new_latest)
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge chunked Dune exports into the transaction store",
+        epilog="Exports newer than the store are appended (cost: the new rows). An export with "
+               "older swaps, e.g. dune_query.sql re-run for earlier days, is a backfill and "
+               "rewrites the whole store (cost: the store size).")
+    parser.add_argument('exports', nargs='+', help='Dune CSV exports (globs allowed)')
+    parser.add_argument('--store', default=STORE_FILE, help='time-sorted transaction CSV')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    files = sorted({f for pattern in args.exports for f in (glob.glob(pattern) or [pattern])})
+    print(f"📥 Ingesting {len(files)} export file(s) into {args.store}...")
+    start = time.perf_counter()
+    stats = ingest(files, store=args.store, chunk_rows=args.chunk_rows)
+    print(f"✓ Read {stats['read']:,} rows, added {stats['added']:,} new swaps ({stats['mode']}) "
+          f"in {time.perf_counter() - start:.2f}s")
@@ -1,108 +1,241 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import re
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error
-
-# Set Portfolio Style
-plt.style.use('dark_background')
-sns.set_context("talk")
-colors = ["#E97451", "#2A9D8F", "#F4A261", "#264653", "#E76F51"]
-sns.set_palette(sns.color_palette(colors))
-
-def extract_sqm(text):
-    if pd.isna(text): return None
-    # Look for patterns like "35sqm" or "35 sqm"
-    match = re.search(r'(\d+)\s*sqm', text, re.IGNORECASE)
-    if match:
-        return float(match.group(1))
-    return None
-
-def analyze_hedonic_pricing():
+import json
+import os
+import sys
+import argparse
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import stage
+from plot_style import pyplot
+
+MODEL_PATH = "Data/hedonic_model.json"
+
+# Feature-extraction config: keyword lists are matched as plain substrings of the
+# lower-cased description + inclusions text. Saved alongside the coefficients so
+# scoring always uses the same rules the model was fitted with.
+FEATURE_CONFIG = {
+    'sqm_pattern': r'(\d+)\s*sqm',
+    'keywords': {
+        'has_breakfast': ['breakfast', 'meal'],
+        'has_view': ['view', 'ocean', 'sea', 'garden', 'pool'],
+        'is_suite': ['suite', 'villa'],
+        'has_balcony': ['balcony', 'terrace'],
+        'has_living_area': ['living'],
+        'has_club_access': ['club', 'executive'],
+    },
+}
+FEATURES = ['sqm'] + list(FEATURE_CONFIG['keywords'])
+
+def extract_features(descriptions, inclusions, config=FEATURE_CONFIG):
+    """Vectorized feature extraction from room description and inclusions text.
+
+    Returns a DataFrame with one column per feature; `sqm` is NaN where the
+    description carries no size.
+    """
+    descriptions = pd.Series(descriptions, dtype=object).reset_index(drop=True)
+    inclusions = pd.Series(inclusions, dtype=object).reset_index(drop=True)
+
+    full_text = (descriptions.fillna('').astype(str) + " " + inclusions.fillna('').astype(str)).str.lower()
+
+    features = pd.DataFrame(index=full_text.index)
+    features['sqm'] = descriptions.fillna('').astype(str).str.extract(
+        config['sqm_pattern'], flags=re.IGNORECASE, expand=False).astype(float)
+    for name, words in config['keywords'].items():
+        pattern = '|'.join(re.escape(w) for w in words)
+        features[name] = full_text.str.contains(pattern, regex=True).astype(np.int8)
+
+    return features
+
+def _class_names(room_classes):
+    """Room class names as strings (the JSON keys of the saved fills), None where missing"""
+    return [None if pd.isna(c) else str(c) for c in room_classes]
+
+def room_class_medians(sqm, room_classes):
+    """Median sqm per room class, over the rooms that state a size"""
+    sqm = pd.Series(np.asarray(sqm, dtype=np.float64))
+    medians = sqm.groupby(_class_names(room_classes)).median()
+    return {name: float(value) for name, value in medians.dropna().items()}
+
+def fill_sqm(sqm, room_classes, class_fill, sqm_fill):
+    """Fill missing sqm with the room class median, then the global fill"""
+    sqm = pd.Series(sqm)
+    if room_classes is not None:
+        by_class = pd.Series(_class_names(room_classes), index=sqm.index, dtype=object).map(class_fill)
+        sqm = sqm.fillna(by_class.astype(np.float64))
+    return sqm.fillna(sqm_fill)
+
+def save_model(model, sqm_fill, class_fill=None, path=MODEL_PATH, config=FEATURE_CONFIG):
+    """Persist the fitted linear model, its sqm fills and feature config as compact JSON"""
+    artifact = {
+        'features': FEATURES,
+        'coef': [float(c) for c in model.coef_],
+        'intercept': float(model.intercept_),
+        'sqm_fill': float(sqm_fill),
+        'sqm_fill_by_class': class_fill or {},
+        'config': config,
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+    # Later score() calls in this process must see the new coefficients
+    load_model.cache_clear()
+    return path
+
+@lru_cache(maxsize=None)
+def load_model(path=MODEL_PATH):
+    """Load a saved hedonic model artifact (cached, so it is read once per process)"""
+    with open(path) as f:
+        artifact = json.load(f)
+    artifact['coef'] = np.asarray(artifact['coef'], dtype=np.float64)
+    return artifact
+
+def score(descriptions, inclusions, room_classes=None, model_path=MODEL_PATH):
+    """Price a batch of room listings with the saved hedonic model.
+
+    Rooms without a size in the description are filled as in training: the
+    training median of their room class (when `room_classes` is given), else
+    the training median sqm. Returns a float64 array of predicted total
+    prices (IDR).
+    """
+    artifact = load_model(model_path)
+    features = extract_features(descriptions, inclusions, artifact['config'])
+    features['sqm'] = fill_sqm(features['sqm'], room_classes,
+                               artifact.get('sqm_fill_by_class', {}), artifact['sqm_fill'])
+
+    X = features[artifact['features']].to_numpy(dtype=np.float64)
+    return X @ artifact['coef'] + artifact['intercept']
+
+def build_comparable_index(features, rates, room_ids=None):
+    """Build a KD-tree over standardized hedonic feature vectors.
+
+    `features` needs the FEATURES columns with `sqm` already filled. Columns are
+    z-scaled so a square metre and a binary amenity carry comparable weight.
+    """
+    from sklearn.neighbors import KDTree
+
+    X = features[FEATURES].to_numpy(dtype=np.float64)
+    center = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    return {
+        'tree': KDTree((X - center) / scale),
+        'center': center,
+        'scale': scale,
+        'rates': np.asarray(rates, dtype=np.float64),
+        'room_ids': np.arange(len(X)) if room_ids is None else np.asarray(room_ids),
+    }
+
+def find_comparables(index, features, k=5):
+    """Find the k most similar market rooms for each query room.
+
+    Returns (room_ids, rates, distances), each shaped (n_queries, k) and
+    ordered nearest first.
+    """
+    X = (features[FEATURES].to_numpy(dtype=np.float64) - index['center']) / index['scale']
+    k = min(k, len(index['rates']))
+    distances, idx = index['tree'].query(X, k=k)
+    return index['room_ids'][idx], index['rates'][idx], distances
+
+def analyze_hedonic_pricing(plots=True):
+    """Fit the hedonic model and save it; returns the coefficient table"""
     print("--- Starting Hedonic Pricing Analysis ---")
     
-    # 1. Load Data
-    try:
-        df = pd.read_csv("Data/hotel_data_cleaned.csv")
-    except FileNotFoundError:
-        print("Error: Data file not found.")
-        return
-
-    # Basic Cleaning
-    df['total_price'] = pd.to_numeric(df['total_price'], errors='coerce')
-    df = df.dropna(subset=['total_price'])
-    
-    # Filter for realistic price range (exclude potential outliers/errors)
-    df = df[df['total_price'] > 100000] 
+    with stage('load') as s:
+        # 1. Load Data
+        try:
+            df = pd.read_csv("Data/hotel_data_cleaned.csv")
+        except FileNotFoundError:
+            print("Error: Data file not found.")
+            return
 
-    # 2. Feature Engineering (NLP on 'room_description' and 'inclusions_text')
-    print("Extracting features from text...")
+        # Basic Cleaning
+        df['total_price'] = pd.to_numeric(df['total_price'], errors='coerce')
+        df = df.dropna(subset=['total_price'])
     
-    # Combine text fields for easier searching
-    df['full_text'] = (df['room_description'].fillna('') + " " + df['inclusions_text'].fillna('')).str.lower()
+        # Filter for realistic price range (exclude potential outliers/errors)
+        df = df[df['total_price'] > 100000] 
+        s['rows'] = len(df)
+
+    with stage('parse', rows=len(df)):
+        # 2. Feature Engineering (NLP on 'room_description' and 'inclusions_text')
+        print("Extracting features from text...")
     
-    # Binary Features (Attributes)
-    df['has_breakfast'] = df['full_text'].apply(lambda x: 1 if any(w in x for w in ['breakfast', 'meal']) else 0)
-    df['has_view'] = df['full_text'].apply(lambda x: 1 if any(w in x for w in ['view', 'ocean', 'sea', 'garden', 'pool']) else 0)
-    df['is_suite'] = df['full_text'].apply(lambda x: 1 if 'suite' in x or 'villa' in x else 0)
-    df['has_balcony'] = df['full_text'].apply(lambda x: 1 if any(w in x for w in ['balcony', 'terrace']) else 0)
-    df['has_living_area'] = df['full_text'].apply(lambda x: 1 if 'living' in x else 0)
-    df['has_club_access'] = df['full_text'].apply(lambda x: 1 if 'club' in x or 'executive' in x else 0)
-
-    # Numeric Features
-    df['sqm'] = df['room_description'].apply(extract_sqm)
-    # Fill missing sqm with median of the room type or global median
-    df['sqm'] = df['sqm'].fillna(df.groupby('room_class_name')['sqm'].transform('median'))
-    df['sqm'] = df['sqm'].fillna(df['sqm'].median())
+        features = extract_features(df['room_description'], df['inclusions_text'])
+        features.index = df.index
+        df[FEATURES] = features[FEATURES]
+
+        # Fill missing sqm with median of the room type or global median
+        # (saved with the model, so score() fills the same way)
+        class_fill = room_class_medians(df['sqm'], df['room_class_name'])
+        df['sqm'] = fill_sqm(df['sqm'], df['room_class_name'], class_fill, np.nan)
+        sqm_fill = df['sqm'].median()
+        df['sqm'] = df['sqm'].fillna(sqm_fill)
     
-    # 3. Prepare Model Data
-    features = ['sqm', 'has_breakfast', 'has_view', 'is_suite', 'has_balcony', 'has_living_area', 'has_club_access']
-    target = 'total_price'
+    with stage('fit', rows=len(df)):
+        # 3. Prepare Model Data
+        features = FEATURES
+        target = 'total_price'
     
-    X = df[features]
-    y = df[target]
+        X = df[features]
+        y = df[target]
     
-    # 4. Train Model (Linear Regression for Interpretability)
-    model = LinearRegression()
-    model.fit(X, y)
+        # 4. Train Model (Linear Regression for Interpretability)
+        from sklearn.linear_model import LinearRegression
+        model = LinearRegression()
+        model.fit(X, y)
     
-    # 5. Extract Coefficients (The "Price Tag")
-    coef_df = pd.DataFrame({
-        'Feature': features,
-        'Value_IDR': model.coef_
-    })
-    coef_df = coef_df.sort_values(by='Value_IDR', ascending=False)
+        # 5. Extract Coefficients (The "Price Tag")
+        coef_df = pd.DataFrame({
+            'Feature': features,
+            'Value_IDR': model.coef_
+        })
+        coef_df = coef_df.sort_values(by='Value_IDR', ascending=False)
     
-    print("\n--- Hedonic Pricing Results ---")
-    print(f"Base Price (Intercept): IDR {model.intercept_:,.0f}")
-    print(coef_df)
+        print("\n--- Hedonic Pricing Results ---")
+        print(f"Base Price (Intercept): IDR {model.intercept_:,.0f}")
+        print(coef_df)
+
+        # Persist the fitted model so new rate-shop data can be scored without retraining
+        save_model(model, sqm_fill, class_fill)
+        print(f"Model saved to {MODEL_PATH}")
     
-    # 6. Visualization
-    plt.figure(figsize=(10, 6))
+    if not plots:
+        return coef_df
+
+    with stage('render'):
+        # 6. Visualization
+        plt, sns = pyplot()
+        plt.figure(figsize=(10, 6))
     
-    # Color mapping: Green for positive value, Red for negative (if any)
-    bar_colors = ['#2A9D8F' if x > 0 else '#E97451' for x in coef_df['Value_IDR']]
+        # Color mapping: Green for positive value, Red for negative (if any)
+        bar_colors = ['#2A9D8F' if x > 0 else '#E97451' for x in coef_df['Value_IDR']]
     
-    sns.barplot(data=coef_df, x='Value_IDR', y='Feature', palette=bar_colors)
+        sns.barplot(data=coef_df, x='Value_IDR', y='Feature', palette=bar_colors)
     
-    plt.title("Hedonic Pricing: The Monetary Value of Features", color='white', pad=20)
-    plt.xlabel("Price Premium (IDR)", color='white')
-    plt.ylabel("Feature", color='white')
-    plt.axvline(x=0, color='white', linestyle='--', linewidth=1)
-    plt.grid(axis='x', color='#27272a', linestyle='--')
+        plt.title("Hedonic Pricing: The Monetary Value of Features", color='white', pad=20)
+        plt.xlabel("Price Premium (IDR)", color='white')
+        plt.ylabel("Feature", color='white')
+        plt.axvline(x=0, color='white', linestyle='--', linewidth=1)
+        plt.grid(axis='x', color='#27272a', linestyle='--')
     
-    # Format x-axis labels as Millions (Example: 0.5M)
-    ax = plt.gca()
-    vals = ax.get_xticks()
-    ax.set_xticklabels(['{:,.1f}M'.format(x/1000000) for x in vals])
+        # Format x-axis labels as Millions (Example: 0.5M)
+        ax = plt.gca()
+        vals = ax.get_xticks()
+        ax.set_xticklabels(['{:,.1f}M'.format(x/1000000) for x in vals])
     
-    plt.tight_layout()
-    plt.savefig("assets/plots/hedonic_valuation.png", transparent=True, dpi=150)
+        plt.tight_layout()
+
+    with stage('save'):
+        plt.savefig("assets/plots/hedonic_valuation.png", transparent=True, dpi=150)
     print("\nPlot saved to assets/plots/hedonic_valuation.png")
+    return coef_df
 
 if __name__ == "__main__":
-    analyze_hedonic_pricing()
+    parser = argparse.ArgumentParser(description="Hedonic pricing model for Bali room rates")
+    parser.add_argument('--no-plots', action='store_true', help='fit and save the model without drawing charts')
+    args = parser.parse_args()
+    analyze_hedonic_pricing(plots=not args.no_plots)
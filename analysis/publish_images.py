@@ -0,0 +1,213 @@
+"""
+Image Publishing
+Turns the full-size 150-dpi chart PNGs into responsive web assets:
+
+1. Syncs str_reports/visualizations/ into assets/str_analysis/ (changed files only).
+2. Hashes every published PNG (sha256) so identical charts are encoded once.
+3. Encodes each unique image at several widths as a palette-quantized,
+   optimized PNG fallback and a lossless WebP of the same palette image, in a
+   thread pool (Pillow releases the GIL while resizing and encoding). Charts
+   are flat colour, where lossy WebP comes out larger than the quantized PNG;
+   a WebP that is still not smaller than its PNG is dropped. Output names
+   contain the content hash, so unchanged charts are skipped on the next run
+   and stale outputs are pruned.
+4. Writes assets/img/manifest.json (source path -> srcset strings) and, with
+   --html, rewrites the pages' <img> tags into <picture> elements.
+
+Usage:
+    python analysis/publish_images.py            # encode + manifest
+    python analysis/publish_images.py --html     # also update the HTML pages
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'assets', 'img')
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, 'manifest.json')
+
+# Folders the pages link images from (relative to the project root)
+SOURCE_DIRS = ['assets/plots', 'assets/str_analysis', 'defi_analysis/03_visualizations',
+               'bali_analysis/03_visualizations']
+
+# Generated folders published by copying: source -> destination
+SYNC_DIRS = {'str_reports/visualizations': 'assets/str_analysis'}
+
+WIDTHS = [480, 960, 1440]
+WEBP_METHOD = 6                 # slowest, smallest lossless encoding
+PNG_COLORS = 256
+SIZES = "(max-width: 768px) 100vw, 960px"
+
+def file_hash(path):
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def sync_dirs(mapping=SYNC_DIRS, root=PROJECT_ROOT):
+    """Copy new or changed PNGs from each source folder to its published folder"""
+    copied = []
+    for source, destination in mapping.items():
+        os.makedirs(os.path.join(root, destination), exist_ok=True)
+        for path in sorted(glob.glob(os.path.join(root, source, '*.png'))):
+            target = os.path.join(root, destination, os.path.basename(path))
+            if not os.path.exists(target) or file_hash(target) != file_hash(path):
+                shutil.copy2(path, target)
+                copied.append(os.path.relpath(target, root))
+    return copied
+
+def collect_sources(source_dirs=SOURCE_DIRS, root=PROJECT_ROOT):
+    """Group published PNGs by content: {sha256: [relative paths]}"""
+    groups = {}
+    for folder in source_dirs:
+        for path in sorted(glob.glob(os.path.join(root, folder, '*.png'))):
+            groups.setdefault(file_hash(path), []).append(os.path.relpath(path, root).replace(os.sep, '/'))
+    return groups
+
+def target_widths(width):
+    """Responsive widths for an image, never upscaled"""
+    return sorted({min(w, width) for w in WIDTHS})
+
+def encode_variants(path, digest, output_dir=OUTPUT_DIR, root=PROJECT_ROOT):
+    """Encode one source image at every target width as optimized PNG and, where smaller, lossless WebP"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with Image.open(os.path.join(root, path)) as source:
+        # Only the header is read until a missing variant needs the pixels
+        width, height = source.size
+        variants = {'webp': [], 'png': []}
+        for w in target_widths(width):
+            h = round(height * w / width)
+            out = {fmt: os.path.join(output_dir, f"{stem}.{digest[:10]}-{w}.{fmt}") for fmt in ['png', 'webp']}
+            # A dropped WebP is missing too, so its width is re-checked on every run
+            if not all(os.path.exists(p) for p in out.values()):
+                image = source if w == width else source.resize((w, h), Image.LANCZOS)
+                # Charts use few colours, so a 256-colour palette is visually lossless
+                palette = image.quantize(PNG_COLORS, method=Image.Quantize.FASTOCTREE)
+                if not os.path.exists(out['png']):
+                    palette.save(out['png'], optimize=True)
+                if not os.path.exists(out['webp']):
+                    palette.convert('RGBA' if 'A' in image.mode else 'RGB').save(
+                        out['webp'], 'WEBP', lossless=True, method=WEBP_METHOD)
+                    if os.path.getsize(out['webp']) >= os.path.getsize(out['png']):
+                        os.remove(out['webp'])
+            for fmt, out_path in out.items():
+                if os.path.exists(out_path):
+                    variants[fmt].append({'src': f"assets/img/{os.path.basename(out_path)}", 'width': w,
+                                          'height': h, 'bytes': os.path.getsize(out_path)})
+    return {'width': width, 'height': height, **variants}
+
+def srcset(variants):
+    return ', '.join(f"{v['src']} {v['width']}w" for v in variants)
+
+def publish(source_dirs=SOURCE_DIRS, output_dir=OUTPUT_DIR, workers=None, root=PROJECT_ROOT):
+    """Encode every unique image and write the manifest; returns the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    groups = collect_sources(source_dirs, root)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoded = dict(zip(groups, pool.map(lambda item: encode_variants(item[1][0], item[0], output_dir, root),
+                                            groups.items())))
+
+    manifest = {}
+    for digest, paths in groups.items():
+        entry = encoded[digest]
+        record = {
+            'sha256': digest,
+            'width': entry['width'],
+            'height': entry['height'],
+            'webp': srcset(entry['webp']),
+            'png': srcset(entry['png']),
+            'fallback': entry['png'][-1]['src'],
+            'bytes': {fmt: {v['width']: v['bytes'] for v in entry[fmt]} for fmt in ['webp', 'png']},
+        }
+        for path in paths:
+            manifest[path] = {**record, 'duplicate_of': paths[0] if path != paths[0] else None}
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    # Prune encodings of images that changed or disappeared
+    keep = {v['src'].split('/')[-1] for e in encoded.values() for fmt in ['webp', 'png'] for v in e[fmt]}
+    for name in os.listdir(output_dir):
+        if name != 'manifest.json' and name not in keep:
+            os.remove(os.path.join(output_dir, name))
+    return manifest
+
+PICTURE_OR_IMG = re.compile(r'<picture data-src="(?P<src>[^"]+)">(?P<inner>.*?)</picture>|<img\b(?P<attrs>[^>]*)>', re.DOTALL)
+ATTR = re.compile(r'([\w-]+)="([^"]*)"')
+
+def render_picture(src, attrs, entry, sizes=SIZES):
+    """<picture> with a WebP source (if any variant beat the PNG) and an optimized PNG fallback for one image"""
+    extra = ''.join(f' {name}="{value}"' for name, value in attrs.items()
+                    if name not in ('src', 'srcset', 'sizes', 'loading'))
+    source = f'<source type="image/webp" srcset="{entry["webp"]}" sizes="{sizes}">' if entry['webp'] else ''
+    return (f'<picture data-src="{src}">{source}'
+            f'<img src="{entry["fallback"]}" srcset="{entry["png"]}" sizes="{sizes}"{extra} loading="lazy">'
+            f'</picture>')
+
+def rewrite_html(pages, manifest):
+    """Replace <img src="published.png"> tags (or refresh existing <picture>s); returns changed pages"""
+    changed = []
+    for page in pages:
+        with open(page) as f:
+            html = f.read()
+
+        def replace(match):
+            if match.group('src'):
+                src = match.group('src')
+                img = re.search(r'<img\b([^>]*)>', match.group('inner'))
+                attrs = dict(ATTR.findall(img.group(1))) if img else {}
+            else:
+                attrs = dict(ATTR.findall(match.group('attrs')))
+                src = attrs.get('src')
+            if src not in manifest:
+                return match.group(0)
+            return render_picture(src, attrs, manifest[src])
+
+        updated = PICTURE_OR_IMG.sub(replace, html)
+        if updated != html:
+            with open(page, 'w') as f:
+                f.write(updated)
+            changed.append(os.path.basename(page))
+    return changed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish responsive WebP/PNG versions of the chart images")
+    parser.add_argument('--workers', type=int, default=None, help='encoder threads (default: CPU count + 4)')
+    parser.add_argument('--html', action='store_true', help='rewrite <img> tags in the HTML pages to <picture>')
+    args = parser.parse_args()
+
+    print("🖼️  Publishing chart images...")
+    copied = sync_dirs()
+    print(f"✓ Synced {len(copied)} changed visualizations into assets/str_analysis")
+
+    start = time.perf_counter()
+    manifest = publish(workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    unique = {entry['sha256']: entry for entry in manifest.values()}
+    original = sum(os.path.getsize(os.path.join(PROJECT_ROOT, path)) for path in manifest)
+    # Bytes a desktop browser fetches at 960w (or the image's own width if smaller):
+    # the WebP where one was kept, else the PNG fallback
+    png_default = sum(entry['bytes']['png'][min(960, entry['width'])] for entry in manifest.values())
+    fetched = sum(entry['bytes']['webp'].get(min(960, entry['width']), entry['bytes']['png'][min(960, entry['width'])])
+                  for entry in manifest.values())
+    print(f"✓ {len(manifest)} images ({len(manifest) - len(unique)} duplicates) encoded in {elapsed:.2f}s")
+    print(f"  Original PNGs: {original / 1024:,.0f} KB  ->  PNG fallback @960w: {png_default / 1024:,.0f} KB"
+          f"  ->  served @960w (WebP where smaller): {fetched / 1024:,.0f} KB")
+
+    if args.html:
+        pages = sorted(glob.glob(os.path.join(PROJECT_ROOT, '*.html')))
+        changed = rewrite_html(pages, manifest)
+        print(f"✓ Updated {len(changed)} pages: {', '.join(changed) or '-'}")
+    print(f"\n✅ Manifest saved to {MANIFEST_PATH}")
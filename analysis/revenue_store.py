@@ -0,0 +1,240 @@
+"""
+Revenue SQL Store
+Embedded analytical database (DuckDB) holding the `bookings`,
+`bookings_archive` and `rate_shopper_log` tables, so the queries in
+assets/downloads/revenue_queries.sql run locally exactly as written.
+
+DuckDB is used rather than SQLite because the queries use PostgreSQL date
+arithmetic (`CURRENT_DATE - 1`, `INTERVAL '1 year'`) that SQLite does not parse.
+
+Tuning: rows are inserted sorted on each table's filter columns so DuckDB's
+per-row-group min/max zone maps skip whole row groups. `bookings` is clustered
+by (segment_code, status, booking_date): the CORP/CHECKED_OUT drill-down reads
+one contiguous run, and within every run booking_date is still ordered, so the
+`booking_date = CURRENT_DATE - 1` pickup lookup prunes to a few row groups
+(backed by an ART index on booking_date). `bookings_archive` is only read by
+date and is clustered on booking_date; the rate-shop log on check_in_date for
+its ORDER BY. Segment and status codes are ENUMs, so filters compare small
+integers instead of strings.
+
+Usage:
+    python analysis/revenue_store.py                       # synthetic 1M bookings
+    python analysis/revenue_store.py --rows 5000000 --rebuild
+    python analysis/revenue_store.py --bookings my_bookings.csv --rebuild
+"""
+
+import argparse
+import os
+import re
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+import duckdb
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQL_FILE = os.path.join(PROJECT_ROOT, 'assets', 'downloads', 'revenue_queries.sql')
+DB_PATH = os.path.join(PROJECT_ROOT, 'Data', 'revenue.duckdb')
+
+# Segment -> (share of bookings, lead-time range in days, ADR multiplier)
+SEGMENT_PROFILES = {
+    'TRANSIENT': (0.40, (0, 60), 1.00),
+    'CORP': (0.20, (0, 30), 0.90),
+    'GROUP': (0.15, (60, 540), 0.80),
+    'OTA': (0.25, (0, 120), 1.05),
+}
+SEGMENTS = list(SEGMENT_PROFILES)
+STATUSES = ['RESERVED', 'CHECKED_OUT', 'CANCELLED', 'NO_SHOW']
+
+BOOKINGS_COLUMNS = [
+    ('confirmation_no', 'BIGINT'),
+    ('property_id', 'VARCHAR'),
+    ('booking_date', 'DATE'),
+    ('check_in_date', 'DATE'),
+    ('lead_time_days', 'INTEGER'),
+    ('nights', 'INTEGER'),
+    ('segment_code', 'segment_code'),
+    ('status', 'booking_status'),
+    ('adr', 'DOUBLE'),
+    ('total_price', 'DOUBLE'),
+    ('total_revenue', 'DOUBLE'),
+]
+
+RATE_SHOPPER_COLUMNS = [
+    ('shop_date', 'DATE'),
+    ('check_in_date', 'DATE'),
+    ('my_property_rate', 'DOUBLE'),
+    ('comp_1_rate', 'DOUBLE'),
+    ('comp_2_rate', 'DOUBLE'),
+    ('comp_3_rate', 'DOUBLE'),
+]
+
+# table -> (columns, insert sort order, ART-indexed columns)
+TABLES = {
+    'bookings': (BOOKINGS_COLUMNS, ['segment_code', 'status', 'booking_date'], ['booking_date']),
+    'bookings_archive': (BOOKINGS_COLUMNS, ['booking_date', 'property_id', 'check_in_date'], ['booking_date']),
+    'rate_shopper_log': (RATE_SHOPPER_COLUMNS, ['check_in_date', 'shop_date'], []),
+}
+
+def generate_bookings(n_bookings=1_000_000, n_properties=8, base_adr=2_500_000, horizon=180,
+                      seed=42, today=None):
+    """Synthetic booking ledger and rate-shop log relative to `today`.
+
+    Booking dates cover the last two years: the most recent year goes to
+    `bookings`, the year before to `bookings_archive` (so the STLY query has a
+    comparable year). The rate shopper logs one row per shop day and check-in
+    date up to `horizon` days ahead.
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(today or date.today())
+
+    # Bookings
+    segment = rng.choice(len(SEGMENTS), n_bookings, p=[p[0] for p in SEGMENT_PROFILES.values()])
+    lead_low = np.array([p[1][0] for p in SEGMENT_PROFILES.values()])[segment]
+    lead_high = np.array([p[1][1] for p in SEGMENT_PROFILES.values()])[segment]
+    lead_time = rng.integers(lead_low, lead_high + 1)
+
+    booking_date = today - pd.to_timedelta(rng.integers(1, 731, n_bookings), unit='D')
+    check_in = booking_date + pd.to_timedelta(lead_time, unit='D')
+    season = 1 + 0.2 * np.sin(2 * np.pi * (check_in.dayofyear.to_numpy() - 180) / 365)
+    adr = np.round(base_adr * season * np.array([p[2] for p in SEGMENT_PROFILES.values()])[segment]
+                   * rng.lognormal(0, 0.15, n_bookings), -3)
+    nights = rng.integers(1, 8, n_bookings)
+    total_price = adr * nights
+
+    # Stays in the past are checked out (a few cancelled / no-show), future stays reserved
+    past = check_in < today
+    status = np.where(past, rng.choice([1, 2, 3], n_bookings, p=[0.90, 0.07, 0.03]),
+                      rng.choice([0, 2], n_bookings, p=[0.93, 0.07]))
+
+    ledger = pd.DataFrame({
+        'confirmation_no': np.arange(1, n_bookings + 1, dtype=np.int64) + 10_000_000,
+        'property_id': pd.Categorical.from_codes(rng.integers(0, n_properties, n_bookings),
+                                                 [f"BALI-{i + 1:02d}" for i in range(n_properties)]),
+        'booking_date': booking_date,
+        'check_in_date': check_in,
+        'lead_time_days': lead_time.astype(np.int32),
+        'nights': nights.astype(np.int32),
+        'segment_code': pd.Categorical.from_codes(segment, SEGMENTS),
+        'status': pd.Categorical.from_codes(status, STATUSES),
+        'adr': adr,
+        'total_price': total_price,
+        'total_revenue': np.where(status == STATUSES.index('CANCELLED'), 0.0, total_price),
+    })
+    archived = ledger['booking_date'] <= today - pd.DateOffset(years=1)
+
+    # Rate shopper log
+    shop_dates = pd.date_range(today - pd.Timedelta(days=730), today - pd.Timedelta(days=1), freq='D')
+    shop = np.repeat(shop_dates.to_numpy(), horizon)
+    stay = shop + np.tile(np.arange(1, horizon + 1), len(shop_dates)).astype('timedelta64[D]')
+    stay_season = 1 + 0.2 * np.sin(2 * np.pi * (pd.DatetimeIndex(stay).dayofyear.to_numpy() - 180) / 365)
+    comp_rates = np.round(base_adr * stay_season[:, None] * rng.lognormal(0, 0.10, (len(shop), 3)), -3)
+    rate_log = pd.DataFrame({
+        'shop_date': shop,
+        'check_in_date': stay,
+        'my_property_rate': np.round(comp_rates.mean(axis=1) * rng.lognormal(0.03, 0.10, len(shop)), -3),
+        'comp_1_rate': comp_rates[:, 0],
+        'comp_2_rate': comp_rates[:, 1],
+        'comp_3_rate': comp_rates[:, 2],
+    })
+
+    return {
+        'bookings': ledger[~archived].reset_index(drop=True),
+        'bookings_archive': ledger[archived].reset_index(drop=True),
+        'rate_shopper_log': rate_log,
+    }
+
+def read_frames(bookings_csv, archive_csv=None, rate_log_csv=None):
+    """Load tables from CSV exports (columns named as in the table schemas)"""
+    frames = {'bookings': pd.read_csv(bookings_csv, parse_dates=['booking_date', 'check_in_date'])}
+    if archive_csv:
+        frames['bookings_archive'] = pd.read_csv(archive_csv, parse_dates=['booking_date', 'check_in_date'])
+    if rate_log_csv:
+        frames['rate_shopper_log'] = pd.read_csv(rate_log_csv, parse_dates=['shop_date', 'check_in_date'])
+    return frames
+
+def build_store(frames, db_path=DB_PATH):
+    """(Re)create the database from {table: DataFrame}; missing tables are created empty"""
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    con = duckdb.connect(db_path)
+    con.execute(f"CREATE TYPE segment_code AS ENUM ({', '.join(repr(s) for s in SEGMENTS)})")
+    con.execute(f"CREATE TYPE booking_status AS ENUM ({', '.join(repr(s) for s in STATUSES)})")
+
+    for table, (columns, sort_key, indexes) in TABLES.items():
+        con.execute(f"CREATE TABLE {table} ({', '.join(f'{name} {dtype}' for name, dtype in columns)})")
+        if table in frames:
+            con.register('frame', frames[table])
+            casts = ', '.join(f"CAST({name} AS {dtype})" for name, dtype in columns)
+            con.execute(f"INSERT INTO {table} SELECT {casts} FROM frame ORDER BY {', '.join(sort_key)}")
+            con.unregister('frame')
+        for column in indexes:
+            con.execute(f"CREATE INDEX idx_{table}_{column} ON {table} ({column})")
+        rows = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"✓ {table}: {rows:,} rows")
+
+    con.execute("CHECKPOINT")
+    con.close()
+    return db_path
+
+def load_queries(path=SQL_FILE):
+    """Split the SQL file into (title, statement) pairs using its numbered section headers"""
+    with open(path) as f:
+        text = f.read()
+    queries = []
+    for statement in text.split(';'):
+        titles = re.findall(r'^--\s*\d+\.\s*(.+)$', statement, flags=re.MULTILINE)
+        body = '\n'.join(line for line in statement.splitlines() if not line.strip().startswith('--'))
+        body = re.sub(r'/\*.*?\*/', '', body, flags=re.DOTALL).strip()
+        if body:
+            queries.append((titles[-1].strip() if titles else f"Query {len(queries) + 1}", body))
+    return queries
+
+def connect(db_path=DB_PATH, read_only=True):
+    """Open the store (read-only by default so several readers can share it)"""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path} not found - run revenue_store.py to build it")
+    return duckdb.connect(db_path, read_only=read_only)
+
+def run_queries(con, queries, repeat=3):
+    """Run each query; returns [(title, result DataFrame, best-of-`repeat` seconds)]"""
+    results = []
+    for title, sql in queries:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = con.execute(sql).df()
+            timings.append(time.perf_counter() - start)
+        results.append((title, result, min(timings)))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the revenue SQL store and run revenue_queries.sql")
+    parser.add_argument('--db', default=DB_PATH, help='database file')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='synthetic bookings to generate')
+    parser.add_argument('--bookings', help='bookings CSV (instead of synthetic data)')
+    parser.add_argument('--archive', help='bookings_archive CSV')
+    parser.add_argument('--rate-log', help='rate_shopper_log CSV')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the database even if it exists')
+    parser.add_argument('--sql', default=SQL_FILE, help='SQL file to run')
+    args = parser.parse_args()
+
+    if args.rebuild or not os.path.exists(args.db):
+        print("🏗️  Building revenue store...")
+        start = time.perf_counter()
+        if args.bookings:
+            frames = read_frames(args.bookings, args.archive, args.rate_log)
+        else:
+            frames = generate_bookings(args.rows)
+        build_store(frames, args.db)
+        print(f"  Built {args.db} in {time.perf_counter() - start:.1f}s")
+
+    con = connect(args.db)
+    for title, result, seconds in run_queries(con, load_queries(args.sql)):
+        print("\n" + "="*70)
+        print(f"{title}  ({len(result):,} rows, {seconds * 1000:.1f} ms)")
+        print("="*70)
+        print(result.head(10).to_string(index=False))
+    con.close()
@@ -0,0 +1,171 @@
+"""
+Swap Time Index
+Time-range queries over the time-sorted swap table without scanning it.
+
+The generator (and dune_ingest.py) keep transactions sorted by timestamp, so a
+range [start, end) is a contiguous block of rows found with two binary
+searches. A per-day offset table narrows each search to one day's rows, and
+per-tier prefix sums of amount_usd turn any range total into two lookups:
+
+    volume(start, end) = cum[pos(end)] - cum[pos(start)]
+
+so range queries cost O(log n) instead of a full scan plus a boolean mask.
+Prefix sums are float64 and kept per tier (only that tier's rows), so the
+index adds ~16 bytes per row on top of the timestamps, which are used as-is
+(a memory-mapped store column is not copied).
+
+Usage:
+    from swap_index import build_time_index, volume, slice_rows
+    index = build_time_index(df)
+    volume(index, '0.05%', '2025-03-01', '2025-03-08')
+    df.iloc[slice_rows(index, '2025-03-01', '2025-03-02')]
+
+    python analysis/swap_index.py                  # benchmark against boolean masks
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from swap_schema import DATA_FILE, FEE_TIERS
+from swap_store import load_swaps
+
+def _tick(value, unit):
+    """One timestamp (str, Timestamp, datetime or datetime64) -> int64 tick in `unit`"""
+    if not isinstance(value, np.datetime64):
+        value = pd.Timestamp(value).to_datetime64()
+    return int(value.astype(f'datetime64[{unit}]').astype(np.int64))
+
+def _ticks(values, unit):
+    """Arrays of timestamps -> int64 ticks in `unit`"""
+    return np.asarray(pd.to_datetime(values).to_numpy(), dtype=f'datetime64[{unit}]').astype(np.int64)
+
+def _day_offsets(ticks, per_day):
+    """First day number and the first row of each day (plus the row count) for sorted ticks"""
+    if len(ticks) == 0:
+        return 0, np.zeros(1, dtype=np.int64)
+    first_day, last_day = ticks[0] // per_day, ticks[-1] // per_day
+    boundaries = (first_day + np.arange(last_day - first_day + 2)) * per_day
+    return int(first_day), np.searchsorted(ticks, boundaries).astype(np.int64)
+
+def build_time_index(df, time_col='timestamp', amount_col='amount_usd', tier_col='fee_tier'):
+    """Build the time index for a swap frame sorted by `time_col`.
+
+    Raises ValueError if the timestamps are not sorted.
+    """
+    times = df[time_col].to_numpy()
+    unit = np.datetime_data(times.dtype)[0]
+    ticks = times.view(np.int64)
+    if len(ticks) and (np.diff(ticks) < 0).any():
+        raise ValueError(f"{time_col} must be sorted ascending to build a time index")
+
+    per_day = int(np.timedelta64(1, 'D') / np.timedelta64(1, unit))
+    first_day, offsets = _day_offsets(ticks, per_day)
+    index = {'unit': unit, 'per_day': per_day, 'ticks': ticks, 'first_day': first_day,
+             'day_offsets': offsets, 'tiers': {}}
+
+    codes = df[tier_col].cat.codes.to_numpy() if tier_col in df else None
+    amounts = df[amount_col].to_numpy(dtype=np.float64)
+    for code, tier in enumerate(FEE_TIERS):
+        rows = np.flatnonzero(codes == code)
+        if len(rows) == 0:
+            continue
+        tier_ticks = ticks[rows]
+        tier_first_day, tier_offsets = _day_offsets(tier_ticks, per_day)
+        index['tiers'][tier] = {
+            'ticks': tier_ticks,
+            'first_day': tier_first_day,
+            'day_offsets': tier_offsets,
+            'cum_volume': np.concatenate([[0.0], np.cumsum(amounts[rows])]),
+        }
+    return index
+
+def _position(ticks, first_day, offsets, per_day, t):
+    """First row with tick >= t, searching only within t's day"""
+    day = t // per_day - first_day
+    if day < 0:
+        return 0
+    if day >= len(offsets) - 1:
+        return len(ticks)
+    lo, hi = offsets[day], offsets[day + 1]
+    return int(lo + np.searchsorted(ticks[lo:hi], t))
+
+def slice_rows(index, start, end):
+    """Row slice covering timestamps in [start, end)"""
+    lo, hi = (_position(index['ticks'], index['first_day'], index['day_offsets'], index['per_day'], t)
+              for t in (_tick(start, index['unit']), _tick(end, index['unit'])))
+    return slice(lo, max(lo, hi))
+
+def _tier_range(index, tier, start, end):
+    part = index['tiers'].get(tier)
+    if part is None:
+        if tier not in FEE_TIERS:
+            raise KeyError(f"Unknown fee tier {tier!r}; expected one of {FEE_TIERS}")
+        return None, 0, 0
+    lo, hi = (_position(part['ticks'], part['first_day'], part['day_offsets'], index['per_day'], t)
+              for t in (_tick(start, index['unit']), _tick(end, index['unit'])))
+    return part, lo, max(lo, hi)
+
+def volume(index, tier, start, end):
+    """Total amount_usd of `tier` swaps in [start, end); tier=None sums all tiers"""
+    if tier is None:
+        return sum(volume(index, t, start, end) for t in index['tiers'])
+    part, lo, hi = _tier_range(index, tier, start, end)
+    return 0.0 if part is None else float(part['cum_volume'][hi] - part['cum_volume'][lo])
+
+def trade_count(index, tier, start, end):
+    """Number of `tier` swaps in [start, end); tier=None counts all tiers"""
+    if tier is None:
+        s = slice_rows(index, start, end)
+        return s.stop - s.start
+    _, lo, hi = _tier_range(index, tier, start, end)
+    return hi - lo
+
+def range_volumes(index, tier, starts, ends):
+    """Vectorized volume() for arrays of ranges (plain searchsorted over the tier's ticks)"""
+    part = index['tiers'].get(tier)
+    if part is None:
+        return np.zeros(len(starts))
+    lo = np.searchsorted(part['ticks'], _ticks(starts, index['unit']))
+    hi = np.maximum(lo, np.searchsorted(part['ticks'], _ticks(ends, index['unit'])))
+    return part['cum_volume'][hi] - part['cum_volume'][lo]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark time-range queries with the swap time index")
+    parser.add_argument('path', nargs='?', default=DATA_FILE, help='swap CSV (served from its column store)')
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    df = load_swaps(args.path, columns=['timestamp', 'amount_usd', 'fee_tier'])
+    print(f"🔎 Time index over {len(df):,} swaps")
+
+    start = time.perf_counter()
+    index = build_time_index(df)
+    print(f"✓ Built in {time.perf_counter() - start:.2f}s "
+          f"({len(index['day_offsets']) - 1:,} days, tiers: {', '.join(index['tiers'])})")
+
+    rng = np.random.default_rng(0)
+    lo_t, hi_t = df['timestamp'].iloc[0], df['timestamp'].iloc[-1]
+    span = (hi_t - lo_t).total_seconds()
+    starts = lo_t + pd.to_timedelta(rng.uniform(0, span, args.queries), unit='s')
+    ends = starts + pd.to_timedelta(rng.uniform(3600, 30 * 86400, args.queries), unit='s')
+    tier = max(index['tiers'], key=lambda t: len(index['tiers'][t]['ticks']))
+
+    start = time.perf_counter()
+    indexed = [volume(index, tier, s, e) for s, e in zip(starts, ends)]
+    indexed_s = (time.perf_counter() - start) / args.queries
+
+    mask_queries = min(args.queries, 50)
+    is_tier = (df['fee_tier'] == tier).to_numpy()
+    amounts = df['amount_usd'].to_numpy(dtype=np.float64)
+    times = df['timestamp'].to_numpy()
+    start = time.perf_counter()
+    masked = [amounts[is_tier & (times >= s.to_datetime64()) & (times < e.to_datetime64())].sum()
+              for s, e in zip(starts[:mask_queries], ends[:mask_queries])]
+    masked_s = (time.perf_counter() - start) / mask_queries
+
+    assert np.allclose(indexed[:mask_queries], masked, rtol=1e-9), "index disagrees with the mask"
+    print(f"  volume({tier!r}, start, end): {indexed_s * 1e6:8.1f} µs/query (index)")
+    print(f"  boolean mask scan:        {masked_s * 1e6:8.1f} µs/query  -> {masked_s / indexed_s:,.0f}x")
+    print("\n✅ Indexed totals match the full scan")
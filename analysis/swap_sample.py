@@ -0,0 +1,251 @@
+"""
+Swap Sample
+Persistent stratified sample of the swap table for instant approximate
+previews (uniswap_big_data.py --approx) with 95% confidence intervals.
+
+One streaming pass over the column store builds, for every (month, fee tier)
+stratum:
+
+    count      exact number of swaps
+    top        the TOP_ROWS largest swaps, kept exactly (a take-all stratum:
+               amounts are log-normal, and a handful of whales would
+               otherwise dominate the sampling error)
+    sample     a uniform sample of SAMPLE_ROWS of the remaining swaps
+
+The sample is bottom-k by a priority key derived from each transaction hash
+(splitmix64), so it does not depend on chunk boundaries or scan order, and two
+states merge exactly: keep the largest amounts as top rows, offer the displaced
+ones to the sample, keep the smallest keys. A stratum total is estimated as
+
+    total = sum(top) + (count - len(top)) * mean(sample)
+
+with the finite-population variance (count - len(top))^2 (1 - n/N') s^2 / n.
+The sample is saved next to the column store and reused until the CSV changes.
+
+Usage:
+    from swap_sample import load_sample, estimate_tables
+    tables = estimate_tables(load_sample('Data/uniswap_large_transactions.csv'))
+
+    python analysis/swap_sample.py --check        # compare estimates with exact totals
+"""
+
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from swap_schema import DATA_FILE, FEE_RATES, FEE_TIERS
+from swap_store import build_store, open_store, read_schema
+
+SAMPLE_ROWS = 2000
+TOP_ROWS = 100
+SEED = 0
+Z_95 = 1.96
+CHUNK_ROWS = 1_000_000
+SAMPLE_FILE = 'sample.npz'
+
+def priority_keys(hash_words, seed=SEED):
+    """Uniform-looking uint64 sampling priorities from the low hash words (splitmix64)"""
+    x = hash_words[:, -1] ^ (hash_words[:, -2] * np.uint64(0x9E3779B97F4A7C15)) ^ np.uint64(seed)
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def new_state(sample_rows=SAMPLE_ROWS, top_rows=TOP_ROWS, seed=SEED):
+    return {'sample_rows': sample_rows, 'top_rows': top_rows, 'seed': seed, 'strata': {}}
+
+def _empty_stratum():
+    empty = {'amount': np.empty(0), 'key': np.empty(0, dtype=np.uint64)}
+    return {'count': 0, 'top': dict(empty), 'sample': dict(empty)}
+
+def _fold(stratum, amounts, keys, top_rows, sample_rows):
+    """Merge new rows into a stratum: largest amounts to `top`, the rest offered to `sample`"""
+    amounts = np.concatenate([stratum['top']['amount'], amounts])
+    keys = np.concatenate([stratum['top']['key'], keys])
+    if len(amounts) <= top_rows:
+        top, rest = np.arange(len(amounts)), np.empty(0, dtype=np.int64)
+    elif top_rows == 0:
+        top, rest = np.empty(0, dtype=np.int64), np.arange(len(amounts))
+    else:
+        split = np.argpartition(amounts, len(amounts) - top_rows)
+        top, rest = split[len(amounts) - top_rows:], split[:len(amounts) - top_rows]
+    stratum['top'] = {'amount': amounts[top], 'key': keys[top]}
+
+    pool_amounts = np.concatenate([stratum['sample']['amount'], amounts[rest]])
+    pool_keys = np.concatenate([stratum['sample']['key'], keys[rest]])
+    if len(pool_keys) > sample_rows:
+        keep = np.argpartition(pool_keys, sample_rows - 1)[:sample_rows]
+        pool_amounts, pool_keys = pool_amounts[keep], pool_keys[keep]
+    stratum['sample'] = {'amount': pool_amounts, 'key': pool_keys}
+
+def update(state, amounts, ticks, codes, hash_words, unit='us'):
+    """Fold one chunk of swaps (1-d arrays plus the (rows, words) hash array) into the state"""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    keys = priority_keys(np.asarray(hash_words), state['seed'])
+    months = np.asarray(ticks).astype(f'datetime64[{unit}]').astype('datetime64[M]').astype(np.int64)
+    groups, inverse = np.unique(months * len(FEE_TIERS) + codes, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(groups)))])
+
+    for g, group in enumerate(groups):
+        rows = order[bounds[g]:bounds[g + 1]]
+        stratum = state['strata'].setdefault(int(group), _empty_stratum())
+        stratum['count'] += len(rows)
+        _fold(stratum, amounts[rows], keys[rows], state['top_rows'], state['sample_rows'])
+    return state
+
+def merge_states(states):
+    """Combine states built from separate row ranges (same sizes and seed)"""
+    states = list(states)
+    merged = new_state(states[0]['sample_rows'], states[0]['top_rows'], states[0]['seed'])
+    for state in states:
+        for group, stratum in state['strata'].items():
+            target = merged['strata'].setdefault(group, _empty_stratum())
+            target['count'] += stratum['count']
+            for part in ['top', 'sample']:
+                _fold(target, stratum[part]['amount'], stratum[part]['key'],
+                      merged['top_rows'], merged['sample_rows'])
+    return merged
+
+def build_sample(store_dir, sample_rows=SAMPLE_ROWS, top_rows=TOP_ROWS, seed=SEED, chunk_rows=CHUNK_ROWS):
+    """One streaming pass over the column store"""
+    columns = open_store(store_dir, ['transaction_hash', 'timestamp', 'amount_usd', 'fee_tier'])
+    unit = np.datetime_data(columns['timestamp'].dtype)[0]
+    state = new_state(sample_rows, top_rows, seed)
+    rows = len(columns['amount_usd'])
+    for lo in range(0, rows, chunk_rows):
+        hi = min(lo + chunk_rows, rows)
+        update(state, columns['amount_usd'][lo:hi], columns['timestamp'][lo:hi].view(np.int64),
+               columns['fee_tier'][lo:hi].astype(np.int64), columns['hash'][lo:hi], unit)
+    return state
+
+def save_sample(state, path, source=None):
+    """Flatten the strata into one .npz (plus the source CSV stamp)"""
+    parts = []
+    for group, stratum in state['strata'].items():
+        for flag, part in enumerate(['sample', 'top']):
+            size = len(stratum[part]['amount'])
+            parts.append((np.full(size, group), np.full(size, flag, dtype=np.int8),
+                          stratum[part]['amount'], stratum[part]['key']))
+    if parts:
+        groups, flags, amounts, keys = (np.concatenate(column) for column in zip(*parts))
+    else:
+        groups, flags, amounts, keys = (np.empty(0, dtype=t) for t in [np.int64, np.int8, np.float64, np.uint64])
+    meta = {k: state[k] for k in ['sample_rows', 'top_rows', 'seed']}
+    meta['source'] = source
+    np.savez(path, group=groups, is_top=flags, amount=amounts, key=keys,
+             count_group=np.array(list(state['strata']), dtype=np.int64),
+             count=np.array([s['count'] for s in state['strata'].values()], dtype=np.int64),
+             meta=np.array(json.dumps(meta)))
+    return path
+
+def read_sample(path):
+    """Load a saved sample back into a state; returns (state, source stamp)"""
+    with np.load(path) as npz:
+        data = {name: npz[name] for name in npz.files}
+    meta = json.loads(str(data['meta']))
+    state = new_state(meta['sample_rows'], meta['top_rows'], meta['seed'])
+    for group, count in zip(data['count_group'].tolist(), data['count'].tolist()):
+        stratum = {'count': count}
+        for flag, part in enumerate(['sample', 'top']):
+            rows = (data['group'] == group) & (data['is_top'] == flag)
+            stratum[part] = {'amount': data['amount'][rows], 'key': data['key'][rows]}
+        state['strata'][group] = stratum
+    return state, meta['source']
+
+def load_sample(csv_path=DATA_FILE, sample_rows=SAMPLE_ROWS, top_rows=TOP_ROWS, seed=SEED, rebuild=False):
+    """Saved sample for the CSV, built (one pass) when missing, resized or out of date"""
+    store_dir = build_store(csv_path)
+    source = read_schema(store_dir)['source']
+    path = os.path.join(store_dir, SAMPLE_FILE)
+    if os.path.exists(path) and not rebuild:
+        state, saved_source = read_sample(path)
+        if saved_source == source and (state['sample_rows'], state['top_rows'], state['seed']) == (
+                sample_rows, top_rows, seed):
+            return state
+    print(f"Building stratified sample ({sample_rows:,} + top {top_rows} rows per month and tier)...")
+    state = build_sample(store_dir, sample_rows, top_rows, seed)
+    save_sample(state, path, source)
+    return state
+
+def _stratum_estimate(stratum):
+    """(estimate, variance) of a stratum's total amount"""
+    top_total = stratum['top']['amount'].sum()
+    remaining = stratum['count'] - len(stratum['top']['amount'])
+    sample = stratum['sample']['amount']
+    n = len(sample)
+    if remaining == 0 or n == 0:
+        return top_total, 0.0
+    variance = 0.0
+    if n < remaining and n > 1:
+        variance = remaining**2 * (1 - n / remaining) * sample.var(ddof=1) / n
+    return top_total + remaining * sample.mean(), variance
+
+def _with_interval(estimates, variances):
+    table = pd.DataFrame({'estimate': estimates, 'margin': Z_95 * np.sqrt(variances)})
+    table['ci_low'] = table['estimate'] - table['margin']
+    table['ci_high'] = table['estimate'] + table['margin']
+    return table
+
+def estimate_tables(state):
+    """Volume by tier and revenue by month and tier, each with a 95% interval.
+
+    Returns {'volume_by_tier': DataFrame, 'monthly_revenue': DataFrame, 'rows': int};
+    tables have estimate, margin, ci_low and ci_high columns.
+    """
+    rows = []
+    for group, stratum in sorted(state['strata'].items()):
+        month, code = divmod(group, len(FEE_TIERS))
+        tier = FEE_TIERS[code]
+        estimate, variance = _stratum_estimate(stratum)
+        rows.append({'month': pd.Period(str(np.datetime64(month, 'M')), 'M'), 'fee_tier': tier,
+                     'trades': stratum['count'], 'volume': estimate, 'volume_var': variance,
+                     'revenue': estimate * FEE_RATES[tier], 'revenue_var': variance * FEE_RATES[tier]**2})
+    strata = pd.DataFrame(rows)
+
+    # Strata are independent, so variances add
+    by_tier = strata.groupby('fee_tier')[['volume', 'volume_var']].sum()
+    monthly = strata.set_index(['month', 'fee_tier'])
+    return {
+        'volume_by_tier': _with_interval(by_tier['volume'], by_tier['volume_var']),
+        'monthly_revenue': _with_interval(monthly['revenue'], monthly['revenue_var']),
+        'rows': int(strata['trades'].sum()),
+    }
+
+def format_interval(table):
+    """'$estimate ± margin' strings"""
+    return [f"${e:,.0f} ± {m:,.0f}" for e, m in zip(table['estimate'], table['margin'])]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the stratified swap sample and print estimates")
+    parser.add_argument('path', nargs='?', default=DATA_FILE, help='swap CSV (served from its column store)')
+    parser.add_argument('--sample-rows', type=int, default=SAMPLE_ROWS, help='sampled swaps per month and tier')
+    parser.add_argument('--top-rows', type=int, default=TOP_ROWS, help='largest swaps kept exactly per month and tier')
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--check', action='store_true', help='compare with exact totals from the full data')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    state = load_sample(args.path, args.sample_rows, args.top_rows, rebuild=args.rebuild)
+    tables = estimate_tables(state)
+    print(f"🎯 Estimates for {tables['rows']:,} swaps in {time.perf_counter() - start:.2f}s")
+    volume = tables['volume_by_tier']
+    print("\nVolume by Tier (95% CI):")
+    print(pd.Series(format_interval(volume), index=volume.index).to_string())
+
+    if args.check:
+        from swap_store import load_swaps
+        df = load_swaps(args.path, columns=['timestamp', 'amount_usd', 'fee_tier'])
+        df['amount_usd'] = df['amount_usd'].astype('float64')
+        df['month'] = df['timestamp'].dt.to_period('M')
+        exact = df.groupby(['month', 'fee_tier'], observed=True)['amount_usd'].sum()
+        exact = exact * exact.index.get_level_values('fee_tier').map(FEE_RATES).to_numpy(dtype=float)
+        revenue = tables['monthly_revenue'].join(exact.rename('exact'))
+        covered = ((revenue['exact'] >= revenue['ci_low']) & (revenue['exact'] <= revenue['ci_high'])).mean()
+        error = (revenue['estimate'] / revenue['exact'] - 1).abs()
+        print(f"\nMonthly revenue: {covered:.0%} of {len(revenue)} exact values inside their 95% CI; "
+              f"median error {error.median():.2%}, max {error.max():.2%}")
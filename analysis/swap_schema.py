@@ -0,0 +1,256 @@
+"""
+Compact Swap Schema
+In-memory layout for the swap transaction table written by generate_big_data.py
+and dune_ingest.py. Pandas' defaults cost ~200 bytes per row (a 36-character
+Python string per hash, an object string per fee tier, float64 everywhere);
+the compact frame needs ~37:
+
+    transaction_hash  ->  hash_0, hash_1      2 x uint64 (16 bytes; a uuid)
+                          hash_0 .. hash_3    4 x uint64 once 32-byte 0x tx hashes from
+                                              Dune are present (uuids zero-padded)
+    timestamp         ->  datetime64[us]      (fixed unit, whatever pandas infers)
+    fee_tier          ->  category (int8 codes over FEE_TIERS)
+    amount_usd, gas_cost_usd, slippage_impact  ->  float32
+
+Hash words are big-endian, so sorting them sorts the hex strings. float32 keeps
+~7 significant digits (a $10M swap to the dollar); pass exact=True to keep
+float64 for any column float32 cannot hold exactly. Columns that were rounded
+are listed in df.attrs['lossy_columns'], and write_swaps refuses such a frame
+unless told otherwise, so CSV -> compact -> CSV never changes values silently.
+With exact=True that round trip is lossless; compact -> CSV -> compact is
+bit-identical either way.
+
+Usage:
+    from swap_schema import read_swaps
+    df = read_swaps('Data/uniswap_large_transactions.csv')
+
+    python analysis/swap_schema.py                     # memory report + round-trip check
+"""
+
+import argparse
+import io
+import os
+import time
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILE = os.path.join(PROJECT_ROOT, 'Data', 'uniswap_large_transactions.csv')
+
+CSV_COLUMNS = ['transaction_hash', 'timestamp', 'amount_usd', 'fee_tier', 'gas_cost_usd', 'slippage_impact']
+FEE_TIERS = ['0.01%', '0.05%', '0.3%', '1.0%']
+FEE_TIER_DTYPE = pd.CategoricalDtype(FEE_TIERS)
+FEE_RATES = {'0.01%': 0.0001, '0.05%': 0.0005, '0.3%': 0.0030, '1.0%': 0.0100}
+FLOAT32_COLUMNS = ['amount_usd', 'gas_cost_usd', 'slippage_impact']
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+CHUNK_ROWS = 500_000
+LOSSY_ATTR = 'lossy_columns'
+
+def hash_columns(words):
+    return [f'hash_{i}' for i in range(words)]
+
+HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+HEX_VALUES[HEX_DIGITS] = np.arange(16)
+HEX_VALUES[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+UUID_DASHES = [8, 13, 18, 23]
+UUID_DIGITS = np.setdiff1d(np.arange(36), UUID_DASHES)
+
+def _ascii(values, width):
+    """Strings -> (n, width) uint8 array of their ASCII bytes"""
+    return np.asarray(values, dtype=f'S{width}').view(np.uint8).reshape(-1, width)
+
+def _unhex(chars):
+    """(n, 2k) ASCII hex digits -> (n, k / 8) big-endian uint64 words"""
+    nibbles = np.take(HEX_VALUES, chars)
+    if nibbles.max(initial=0) > 15:
+        raise ValueError("Transaction hashes must be hexadecimal")
+    raw = (nibbles[:, ::2] << 4) | nibbles[:, 1::2]
+    return np.ascontiguousarray(raw).view('>u8').astype(np.uint64)
+
+def encode_hashes(values):
+    """Hex transaction hashes (uuid or 0x-prefixed) -> (n, words) big-endian uint64 array.
+
+    Mixed lengths (a synthetic store topped up with Dune swaps) are left-padded
+    with zero bytes to the longest hash.
+    """
+    values = pd.Series(values)
+    if len(values) == 0:
+        return np.empty((0, 2), dtype=np.uint64)
+
+    lengths = values.str.len()
+    if (lengths == 36).all():
+        # Fast path for uuids: drop the dashes by column position
+        chars = _ascii(values, 36)
+        if (chars[:, UUID_DASHES] == ord('-')).all():
+            return _unhex(chars[:, UUID_DIGITS])
+
+    digits = values.astype(str).str.replace('-', '', regex=False).str.removeprefix('0x').str.removeprefix('0X')
+    lengths = digits.str.len()
+    if (lengths % 16).any():
+        raise ValueError(f"Transaction hashes must be whole 8-byte words, got lengths {sorted(lengths.unique())}")
+    width = int(lengths.max())
+    if (lengths != width).any():
+        digits = digits.str.zfill(width)
+    return _unhex(_ascii(digits, width))
+
+def widen_hashes(words, width):
+    """Left-pad (n, words) hash arrays with zero words"""
+    if words.shape[1] == width:
+        return words
+    return np.hstack([np.zeros((len(words), width - words.shape[1]), dtype=np.uint64), words])
+
+def decode_hashes(words):
+    """(n, words) uint64 array -> hash strings; 16-byte values are uuids, longer ones 0x-hex"""
+    raw = np.ascontiguousarray(words, dtype='>u8').view(np.uint8).reshape(len(words), -1)
+    chars = np.empty((len(raw), raw.shape[1] * 2), dtype=np.uint8)
+    chars[:, ::2] = HEX_DIGITS[raw >> 4]
+    chars[:, 1::2] = HEX_DIGITS[raw & 15]
+
+    out = np.empty(len(raw), dtype=object)
+    is_uuid = ~np.asarray(words)[:, :-2].any(axis=1)
+    if is_uuid.any():
+        uuid_chars = np.insert(chars[is_uuid, -32:], [8, 12, 16, 20], ord('-'), axis=1)
+        out[is_uuid] = np.ascontiguousarray(uuid_chars).view('S36').ravel().astype(str)
+    if not is_uuid.all():
+        tx_chars = np.hstack([np.full((len(raw), 2), np.frombuffer(b'0x', dtype=np.uint8)), chars])[~is_uuid]
+        out[~is_uuid] = np.ascontiguousarray(tx_chars).view(f'S{tx_chars.shape[1]}').ravel().astype(str)
+    return out
+
+def fee_tiers(values):
+    """Fee tier strings -> categorical over FEE_TIERS (unknown tiers are an error)"""
+    values = pd.Series(values).astype(str)
+    unknown = set(values.unique()) - set(FEE_TIERS)
+    if unknown:
+        raise ValueError(f"Unknown fee tiers: {sorted(unknown)}")
+    return pd.Categorical(values, dtype=FEE_TIER_DTYPE)
+
+def to_compact(df, exact=False):
+    """CSV-schema DataFrame -> compact DataFrame; attrs['lossy_columns'] lists columns rounded to float32"""
+    out = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    lossy = []
+    if 'transaction_hash' in df.columns:
+        words = encode_hashes(df['transaction_hash'])
+        for name, column in zip(hash_columns(words.shape[1]), words.T):
+            out[name] = column
+    if 'timestamp' in df.columns:
+        out['timestamp'] = pd.to_datetime(df['timestamp']).to_numpy().astype('datetime64[us]')
+    for column in CSV_COLUMNS:
+        if column not in df.columns or column in ('transaction_hash', 'timestamp'):
+            continue
+        if column == 'fee_tier':
+            out[column] = fee_tiers(df[column])
+            continue
+        values = df[column].to_numpy(dtype=np.float64)
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow, values, equal_nan=True):
+            out[column] = narrow
+        elif exact:
+            out[column] = values
+        else:
+            out[column] = narrow
+            lossy.append(column)
+    out.attrs[LOSSY_ATTR] = lossy
+    return out
+
+def from_compact(compact):
+    """Compact DataFrame -> CSV-schema DataFrame (string hashes, tiers and timestamps)"""
+    out = pd.DataFrame(index=compact.index)
+    words = [c for c in compact.columns if c.startswith('hash_')]
+    for column in CSV_COLUMNS:
+        if column == 'transaction_hash':
+            if words:
+                out[column] = decode_hashes(compact[words].to_numpy())
+        elif column == 'timestamp':
+            if column in compact.columns:
+                out[column] = compact[column].dt.strftime(TIMESTAMP_FORMAT)
+        elif column in compact.columns:
+            out[column] = compact[column].astype(str) if column == 'fee_tier' else compact[column]
+    return out
+
+def read_swaps(path=DATA_FILE, columns=None, exact=False, chunk_rows=CHUNK_ROWS):
+    """Read a swap CSV straight into the compact layout, chunk by chunk.
+
+    `columns` selects CSV columns (all by default). Peak memory stays near one
+    parsed chunk plus the compact result.
+    """
+    usecols = columns or CSV_COLUMNS
+    dtype = {c: np.float64 for c in FLOAT32_COLUMNS if c in usecols}
+    if 'fee_tier' in usecols:
+        dtype['fee_tier'] = 'category'
+    # The default fast float parser can be off by an ulp, which can flip the float32
+    # rounding of a value; round_trip parsing makes the compact values exact
+    chunks = [to_compact(chunk, exact=exact)
+              for chunk in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunk_rows,
+                                       float_precision='round_trip')]
+    if not chunks:
+        return to_compact(pd.DataFrame(columns=usecols), exact=exact)
+    # Hash widths can differ between chunks; pad every chunk to the widest
+    width = max(sum(c.startswith('hash_') for c in chunk.columns) for chunk in chunks)
+    for i, chunk in enumerate(chunks):
+        words = [c for c in chunk.columns if c.startswith('hash_')]
+        if words and len(words) < width:
+            padded = pd.DataFrame(widen_hashes(chunk[words].to_numpy(), width), columns=hash_columns(width))
+            chunks[i] = pd.concat([padded, chunk.drop(columns=words)], axis=1)
+    # A column kept at float64 in any chunk is upcast (exactly) to float64 overall
+    compact = pd.concat(chunks, ignore_index=True)
+    compact.attrs[LOSSY_ATTR] = [c for c in FLOAT32_COLUMNS if any(c in chunk.attrs[LOSSY_ATTR] for chunk in chunks)]
+    return compact
+
+def write_swaps(compact, path, allow_lossy=False):
+    """Write a compact frame back out in the CSV format.
+
+    Raises ValueError if the frame's values were rounded to float32 (see
+    attrs['lossy_columns']), unless `allow_lossy`.
+    """
+    lossy = [c for c in compact.attrs.get(LOSSY_ATTR, []) if c in compact.columns]
+    if lossy and not allow_lossy:
+        raise ValueError(f"{', '.join(lossy)} were rounded to float32, so writing would change the CSV values; "
+                         "read with exact=True or pass allow_lossy=True")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    from_compact(compact).to_csv(path, index=False)
+    return path
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pandas and compact memory use for the swap table")
+    parser.add_argument('path', nargs='?', default=DATA_FILE, help='swap CSV')
+    parser.add_argument('--exact', action='store_true', help='keep float64 where float32 is not exact')
+    args = parser.parse_args()
+
+    print(f"📦 Loading {args.path}...")
+    start = time.perf_counter()
+    plain = pd.read_csv(args.path)
+    plain_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compact = read_swaps(args.path, exact=args.exact)
+    compact_s = time.perf_counter() - start
+
+    print(f"✓ {len(compact):,} rows")
+    print(f"  pandas default: {memory_mb(plain):8.1f} MB  ({plain_s:.2f}s)")
+    print(f"  compact:        {memory_mb(compact):8.1f} MB  ({compact_s:.2f}s)  "
+          f"-> {memory_mb(plain) / max(memory_mb(compact), 1e-9):.1f}x smaller")
+    print(compact.dtypes.to_string())
+
+    # Compact -> CSV -> compact must be bit-identical
+    buffer = io.StringIO()
+    from_compact(compact).to_csv(buffer, index=False)
+    buffer.seek(0)
+    again = read_swaps(buffer, exact=args.exact)
+    assert again.equals(compact), "compact -> CSV -> compact changed the data"
+    print("\n✅ Compact -> CSV -> compact is bit-identical")
+
+    # CSV -> compact -> CSV may only change the columns reported as rounded
+    buffer.seek(0)
+    original = pd.read_csv(args.path, float_precision='round_trip')
+    restored = pd.read_csv(buffer, float_precision='round_trip')
+    changed = [c for c in CSV_COLUMNS if c in original.columns and not original[c].equals(restored[c])]
+    assert set(changed) <= set(compact.attrs[LOSSY_ATTR]), f"CSV -> compact -> CSV changed {changed}"
+    if changed:
+        print(f"⚠️  CSV -> compact -> CSV rounds {', '.join(changed)} to float32 (write_swaps refuses it); "
+              "use --exact for a lossless round trip")
+    else:
+        print("✅ CSV -> compact -> CSV is lossless")
@@ -0,0 +1,162 @@
+"""
+Swap Column Store
+Binary, column-per-file copy of the swap transaction CSV for instant reloads.
+Each column of the compact schema (swap_schema.py) is one .npy file next to a
+schema.json manifest:
+
+    Data/uniswap_large_transactions.store/
+        schema.json          rows, column dtypes, fee tier categories, source CSV stamp
+        hash.npy             (rows, words) uint64
+        timestamp.npy        datetime64
+        amount_usd.npy       float32
+        fee_tier.npy         int8 codes
+        ...
+
+Columns are opened with np.load(mmap_mode='r'): nothing is parsed or copied,
+pages are read on first touch, and every process that opens the store shares
+the same OS page cache. The store is rebuilt whenever the CSV is newer than the
+copy it was built from; files are swapped in atomically and schema.json is
+written last, so readers never see a half-written store.
+
+Usage:
+    from swap_store import load_swaps
+    df = load_swaps('Data/uniswap_large_transactions.csv', columns=['timestamp', 'amount_usd'])
+
+    python analysis/swap_store.py                 # build (if stale) and time a reload
+"""
+
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from swap_schema import (CSV_COLUMNS, DATA_FILE, FEE_TIERS, FEE_TIER_DTYPE, FLOAT32_COLUMNS, LOSSY_ATTR,
+                         hash_columns, read_swaps)
+
+SCHEMA_FILE = 'schema.json'
+STORE_VERSION = 1
+
+def store_path(csv_path):
+    """Default store directory for a CSV: same name with a .store suffix"""
+    return os.path.splitext(csv_path)[0] + '.store'
+
+def _csv_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def read_schema(store_dir):
+    path = os.path.join(store_dir, SCHEMA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def is_stale(csv_path, store_dir):
+    """True if the store is missing, from an older layout, or the CSV changed after it was built"""
+    schema = read_schema(store_dir)
+    if schema is None or schema.get('version') != STORE_VERSION:
+        return True
+    stamp = _csv_stamp(csv_path)
+    return stamp['mtime'] > schema['source']['mtime'] or stamp['size'] != schema['source']['size']
+
+def write_store(compact, store_dir, csv_path=None):
+    """Write a compact swap frame as one .npy file per column plus schema.json"""
+    os.makedirs(store_dir, exist_ok=True)
+    schema_path = os.path.join(store_dir, SCHEMA_FILE)
+    if os.path.exists(schema_path):
+        os.remove(schema_path)
+
+    words = [c for c in compact.columns if c.startswith('hash_')]
+    arrays = {}
+    if words:
+        arrays['hash'] = np.ascontiguousarray(compact[words].to_numpy(dtype=np.uint64))
+    for column in compact.columns:
+        if column in words:
+            continue
+        if column == 'fee_tier':
+            arrays[column] = compact[column].cat.codes.to_numpy(dtype=np.int8)
+        else:
+            arrays[column] = compact[column].to_numpy()
+
+    for name, values in arrays.items():
+        tmp_path = os.path.join(store_dir, f'{name}.tmp.npy')
+        np.save(tmp_path, values)
+        os.replace(tmp_path, os.path.join(store_dir, f'{name}.npy'))
+
+    schema = {
+        'version': STORE_VERSION,
+        'rows': int(len(compact)),
+        'columns': {name: {'dtype': str(values.dtype), 'shape': list(values.shape)}
+                    for name, values in arrays.items()},
+        'fee_tiers': FEE_TIERS,
+        LOSSY_ATTR: list(compact.attrs.get(LOSSY_ATTR, [])),
+        'source': {'path': os.path.abspath(csv_path), **_csv_stamp(csv_path)} if csv_path else None,
+    }
+    with open(schema_path + '.tmp', 'w') as f:
+        json.dump(schema, f, indent=2)
+    os.replace(schema_path + '.tmp', schema_path)
+    return store_dir
+
+def build_store(csv_path=DATA_FILE, store_dir=None, force=False):
+    """(Re)build the store from the CSV if it is stale; returns the store directory"""
+    store_dir = store_dir or store_path(csv_path)
+    if force or is_stale(csv_path, store_dir):
+        print(f"Building column store {store_dir}...")
+        write_store(read_swaps(csv_path), store_dir, csv_path)
+    return store_dir
+
+def open_store(store_dir, columns=None):
+    """Memory-map store columns: {name: read-only array}. `hash` is the (rows, words) hash array"""
+    schema = read_schema(store_dir)
+    if schema is None:
+        raise FileNotFoundError(f"{store_dir} has no {SCHEMA_FILE} - run swap_store.py to build it")
+    names = list(schema['columns']) if columns is None else [
+        'hash' if c == 'transaction_hash' else c for c in columns]
+    return {name: np.load(os.path.join(store_dir, f'{name}.npy'), mmap_mode='r') for name in names}
+
+def to_frame(arrays):
+    """Compact DataFrame over memory-mapped columns (only fee tier codes are materialized)"""
+    data = {}
+    for name, values in arrays.items():
+        if name == 'hash':
+            data.update(zip(hash_columns(values.shape[1]), values.T))
+        elif name == 'fee_tier':
+            data[name] = pd.Categorical.from_codes(values, dtype=FEE_TIER_DTYPE)
+        else:
+            data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+def load_swaps(csv_path=DATA_FILE, columns=None, store_dir=None):
+    """Compact swap frame for `columns` of the CSV, served from the column store"""
+    store_dir = build_store(csv_path, store_dir)
+    ordered = [c for c in CSV_COLUMNS if columns is None or c in columns]
+    frame = to_frame(open_store(store_dir, ordered))
+    # Stores written before lossy columns were recorded: assume float32 columns were rounded
+    lossy = read_schema(store_dir).get(LOSSY_ATTR, FLOAT32_COLUMNS)
+    frame.attrs[LOSSY_ATTR] = [c for c in lossy if c in frame.columns]
+    return frame
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped column store for the swap CSV")
+    parser.add_argument('path', nargs='?', default=DATA_FILE, help='swap CSV')
+    parser.add_argument('--store', default=None, help='store directory (default: <csv>.store)')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild even if the store is up to date')
+    args = parser.parse_args()
+
+    print(f"🗄️  Column store for {args.path}")
+    start = time.perf_counter()
+    store_dir = build_store(args.path, args.store, force=args.rebuild)
+    print(f"✓ Store ready in {time.perf_counter() - start:.2f}s: {store_dir}")
+
+    start = time.perf_counter()
+    df = load_swaps(args.path, store_dir=store_dir)
+    reload_s = time.perf_counter() - start
+    print(f"✓ Reloaded {len(df):,} rows in {reload_s * 1000:.1f} ms (memory-mapped)")
+
+    start = time.perf_counter()
+    parsed = read_swaps(args.path)
+    print(f"  CSV parse for comparison: {time.perf_counter() - start:.2f}s")
+    assert parsed.equals(df), "store does not match the CSV"
+    print("\n✅ Store matches the CSV")
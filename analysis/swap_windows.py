@@ -0,0 +1,113 @@
+"""
+Swap Rolling Windows
+Trailing 1h / 24h / 7d volume, fee revenue, gas and trade counts per fee tier,
+evaluated at every transaction, for spotting bursts that monthly totals hide.
+
+Each tier's rows are already time-sorted, so for a window of width w:
+
+    start[i] = first row with t > t[i] - w          (searchsorted, side='right')
+    sum[i]   = cum[i + 1] - cum[start[i]]           (prefix sums)
+
+The searchsorted pass walks sorted needles through a sorted array and every
+window is two prefix-sum lookups, so a window of any length costs the same
+O(n) sweep; no per-second or resampled series is built. The only temporaries
+are one prefix-sum array per metric and one start array per window.
+
+Usage:
+    from swap_windows import rolling_windows, peak_windows
+    rolled = rolling_windows(df)          # df: compact swap frame (swap_store.load_swaps)
+
+    python analysis/swap_windows.py       # peak 1h/24h/7d bursts per tier
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from swap_schema import DATA_FILE, FEE_RATES, FEE_TIERS
+from swap_store import load_swaps
+
+WINDOWS = {'1h': np.timedelta64(1, 'h'), '24h': np.timedelta64(24, 'h'), '7d': np.timedelta64(7, 'D')}
+METRICS = ['volume', 'revenue', 'gas', 'trades']
+
+def window_starts(ticks, width):
+    """For sorted int64 ticks, the first row of each row's trailing window (t - width, t]"""
+    return np.searchsorted(ticks, ticks - width, side='right')
+
+def rolling_windows(df, windows=WINDOWS, metrics=METRICS, time_col='timestamp'):
+    """Per-transaction trailing-window totals within each fee tier.
+
+    Returns a DataFrame aligned with `df` with one column per metric and
+    window (e.g. volume_1h, trades_7d). Volume, revenue and gas are float64,
+    trade counts int32. Timestamps must be sorted.
+    """
+    times = df[time_col].to_numpy()
+    unit = np.datetime_data(times.dtype)[0]
+    ticks = times.view(np.int64)
+    if len(ticks) and (np.diff(ticks) < 0).any():
+        raise ValueError(f"{time_col} must be sorted ascending for rolling windows")
+
+    codes = df['fee_tier'].cat.codes.to_numpy()
+    out = {f'{metric}_{label}': np.zeros(len(df), dtype=np.int32 if metric == 'trades' else np.float64)
+           for label in windows for metric in metrics}
+
+    for code, tier in enumerate(FEE_TIERS):
+        rows = np.flatnonzero(codes == code)
+        if len(rows) == 0:
+            continue
+        tier_ticks = ticks[rows]
+        amounts = df['amount_usd'].to_numpy()[rows]
+        sources = {
+            'volume': amounts,
+            'revenue': amounts.astype(np.float64) * FEE_RATES[tier],
+            'gas': df['gas_cost_usd'].to_numpy()[rows] if 'gas' in metrics else None,
+        }
+        # One prefix sum per metric, shared by every window
+        cums = {metric: np.concatenate([[0.0], np.cumsum(sources[metric], dtype=np.float64)])
+                for metric in metrics if metric != 'trades'}
+        positions = np.arange(1, len(rows) + 1, dtype=np.int64)
+
+        for label, width in windows.items():
+            starts = window_starts(tier_ticks, int(width / np.timedelta64(1, unit)))
+            for metric in metrics:
+                if metric == 'trades':
+                    out[f'{metric}_{label}'][rows] = positions - starts
+                else:
+                    out[f'{metric}_{label}'][rows] = cums[metric][1:] - cums[metric][starts]
+
+    return pd.DataFrame(out, index=df.index, copy=False)
+
+def peak_windows(df, rolled, metric='volume', windows=WINDOWS, time_col='timestamp'):
+    """Largest trailing-window total per tier and window, and when the window ended"""
+    rows = []
+    for tier in df['fee_tier'].cat.categories:
+        is_tier = (df['fee_tier'] == tier).to_numpy()
+        if not is_tier.any():
+            continue
+        for label in windows:
+            values = rolled[f'{metric}_{label}'].to_numpy()
+            peak = np.flatnonzero(is_tier)[np.argmax(values[is_tier])]
+            rows.append({'fee_tier': tier, 'window': label, f'peak_{metric}': values[peak],
+                         'window_end': df[time_col].iloc[peak],
+                         'trades': rolled[f'trades_{label}'].iloc[peak] if f'trades_{label}' in rolled else None})
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling 1h/24h/7d swap windows per fee tier")
+    parser.add_argument('path', nargs='?', default=DATA_FILE, help='swap CSV (served from its column store)')
+    args = parser.parse_args()
+
+    df = load_swaps(args.path, columns=['timestamp', 'amount_usd', 'fee_tier', 'gas_cost_usd'])
+    print(f"⏱️  Rolling windows over {len(df):,} swaps")
+
+    start = time.perf_counter()
+    rolled = rolling_windows(df)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {len(rolled.columns)} window columns in {elapsed:.2f}s "
+          f"({elapsed / max(len(df), 1) * 1e9:.0f} ns/row)")
+
+    peaks = peak_windows(df, rolled)
+    peaks['peak_volume'] = peaks['peak_volume'].map(lambda x: f"${x:,.0f}")
+    print("\nPeak trailing volume by tier:")
+    print(peaks.to_string(index=False))
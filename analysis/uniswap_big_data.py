@@ -1,60 +1,145 @@
+import os
+import sys
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import stage
+from swap_schema import FEE_RATES, read_swaps
+from swap_store import load_swaps
+from swap_windows import peak_windows, rolling_windows
+from swap_whales import track_whales, whale_report
+from swap_sample import SAMPLE_ROWS, estimate_tables, format_interval, load_sample
 
 # File Path
 DATA_FILE = 'Data/uniswap_large_transactions.csv'
 
-def analyze_large_data():
-    print(f"Loading Big Data from {DATA_FILE}...")
-    
-    # OPTIMIZATION: Read useful columns only to save memory if needed
-    cols = ['timestamp', 'amount_usd', 'fee_tier', 'gas_cost_usd']
-    df = pd.read_csv(DATA_FILE, usecols=cols)
+def analyze_large_data(data_file=DATA_FILE, output_path='assets/plots/web3_big_data.png', plots=True,
+                       use_store=True, rolling=False, whales=0, approx=False, sample_rows=SAMPLE_ROWS):
+    """Volume and revenue by fee tier; returns the monthly revenue table"""
+    if approx:
+        return preview_large_data(data_file, output_path, plots, sample_rows)
+
+    print(f"Loading Big Data from {data_file}...")
     
-    # Convert Time
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    with stage('load') as s:
+        # OPTIMIZATION: Read useful columns only, in the compact schema
+        # (categorical fee tier, float32 amounts, datetime64 timestamps).
+        # The column store memory-maps them; it is (re)built when the CSV is newer.
+        cols = ['timestamp', 'amount_usd', 'fee_tier', 'gas_cost_usd']
+        if use_store:
+            df = load_swaps(data_file, columns=cols)
+        else:
+            df = read_swaps(data_file, columns=cols)
+        s['rows'] = len(df)
     
     print(f"Loaded {len(df):,} rows.")
     
-    # 1. Volume Analysis by Tier
-    # Group by Fee Tier and sum volume
-    volume_by_tier = df.groupby('fee_tier')['amount_usd'].sum()
-    print("\nTotal Volume by Tier:")
-    print(volume_by_tier.apply(lambda x: f"${x:,.0f}"))
+    with stage('aggregate', rows=len(df)):
+        # 1. Volume Analysis by Tier
+        # Group by Fee Tier and sum volume
+        # Sums are accumulated in float64; float32 storage is only for memory
+        df['amount_usd'] = df['amount_usd'].astype('float64')
+        volume_by_tier = df.groupby('fee_tier', observed=True)['amount_usd'].sum()
+        print("\nTotal Volume by Tier:")
+        print(volume_by_tier.apply(lambda x: f"${x:,.0f}"))
     
-    # 2. Profitability Analysis (Simulated)
-    # Revenue = Volume * Tier (e.g. 0.05% = 0.0005)
-    # We map the tier string to a float
-    tier_map = {'0.05%': 0.0005, '0.3%': 0.0030, '1.0%': 0.0100}
-    df['fee_rate'] = df['fee_tier'].map(tier_map)
-    df['revenue_generated'] = df['amount_usd'] * df['fee_rate']
+        # 2. Profitability Analysis (Simulated)
+        # Revenue = Volume * Tier (e.g. 0.05% = 0.0005)
+        # We map the tier string to a float
+        df['fee_rate'] = df['fee_tier'].map(FEE_RATES).astype('float64')
+        df['revenue_generated'] = df['amount_usd'] * df['fee_rate']
     
-    # Group by Month and Tier
-    df['month'] = df['timestamp'].dt.to_period('M')
-    monthly_rev = df.groupby(['month', 'fee_tier'])['revenue_generated'].sum().unstack()
+        # Group by Month and Tier
+        df['month'] = df['timestamp'].dt.to_period('M')
+        monthly_rev = df.groupby(['month', 'fee_tier'], observed=True)['revenue_generated'].sum().unstack()
     
-    # Visualization: Monthly Revenue Trend
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(12, 6))
+    if rolling:
+        with stage('rolling', rows=len(df)):
+            # 3. Burst Detection: trailing 1h/24h/7d windows per tier at every swap
+            rolled = rolling_windows(df)
+            peaks = peak_windows(df, rolled)
+            peaks['peak_volume'] = peaks['peak_volume'].map(lambda x: f"${x:,.0f}")
+            print("\nPeak Rolling Volume by Tier:")
+            print(peaks.to_string(index=False))
+
+    if whales:
+        with stage('whales', rows=len(df)):
+            # 4. Whale Report: top swaps per tier and month, streamed from the column store
+            _, summary = whale_report(track_whales(data_file, k=whales))
+            share = summary.groupby('fee_tier')[['fee_revenue', 'top_k_revenue']].sum()
+            share['share'] = (share['top_k_revenue'] / share['fee_revenue']).map('{:.1%}'.format)
+            print(f"\nFee Revenue Share of the Top {whales} Swaps per Month and Tier:")
+            print(share['share'].to_string())
+
+    if not plots:
+        return monthly_rev
+
+    render_monthly_revenue(monthly_rev, len(df), output_path)
+    return monthly_rev
+
+def render_monthly_revenue(monthly_rev, rows, output_path, estimated=False):
+    """Stacked monthly revenue bars by fee tier"""
+    with stage('render'):
+        # Visualization: Monthly Revenue Trend
+        import matplotlib.pyplot as plt
+        plt.style.use('dark_background')
+        fig, ax = plt.subplots(figsize=(12, 6))
     
-    colors = {'0.05%': '#2a9d8f', '0.3%': '#e9c46a', '1.0%': '#e76f51'}
+        colors = {'0.05%': '#2a9d8f', '0.3%': '#e9c46a', '1.0%': '#e76f51'}
     
-    monthly_rev.plot(kind='bar', stacked=True, ax=ax, color=[colors.get(x, '#fff') for x in monthly_rev.columns])
+        monthly_rev.plot(kind='bar', stacked=True, ax=ax, color=[colors.get(x, '#fff') for x in monthly_rev.columns])
     
-    ax.set_title(f'Monthly Protocol Revenue ({len(df)/1_000_000:.1f}M Transactions)', color='white', fontsize=14, pad=20)
-    ax.set_ylabel('Revenue (USD)', color='#a0a0a0')
-    ax.set_xlabel('Month', color='#a0a0a0')
+        label = 'Estimated from Sample, ' if estimated else ''
+        ax.set_title(f'Monthly Protocol Revenue ({label}{rows/1_000_000:.1f}M Transactions)', color='white', fontsize=14, pad=20)
+        ax.set_ylabel('Revenue (USD)', color='#a0a0a0')
+        ax.set_xlabel('Month', color='#a0a0a0')
     
-    # Remove junk
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['bottom'].set_color('#404040')
-    ax.spines['left'].set_color('#404040')
+        # Remove junk
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['bottom'].set_color('#404040')
+        ax.spines['left'].set_color('#404040')
     
-    plt.tight_layout()
-    output_path = 'assets/plots/web3_big_data.png'
-    plt.savefig(output_path, dpi=150, facecolor='#0a0a0b')
+        plt.tight_layout()
+
+    with stage('save'):
+        plt.savefig(output_path, dpi=150, facecolor='#0a0a0b')
     print(f"Chart saved to {output_path}")
 
+def preview_large_data(data_file=DATA_FILE, output_path='assets/plots/web3_big_data.png', plots=True,
+                       sample_rows=SAMPLE_ROWS):
+    """Approximate volume and revenue tables (95% CI) from the persisted stratified sample"""
+    print(f"Previewing {data_file} from its stratified sample...")
+
+    with stage('sample') as s:
+        # Built in one streaming pass on first use, then reused until the CSV changes
+        tables = estimate_tables(load_sample(data_file, sample_rows))
+        s['rows'] = tables['rows']
+
+    volume = tables['volume_by_tier']
+    print(f"\nTotal Volume by Tier (95% CI, {tables['rows']:,} transactions):")
+    print(pd.Series(format_interval(volume), index=volume.index).to_string())
+
+    monthly = tables['monthly_revenue']
+    print("\nMonthly Revenue by Tier (95% CI):")
+    print(pd.Series(format_interval(monthly), index=monthly.index).unstack().to_string())
+
+    monthly_rev = monthly['estimate'].unstack()
+    if plots:
+        render_monthly_revenue(monthly_rev, tables['rows'], output_path, estimated=True)
+    return monthly_rev
+
 if __name__ == "__main__":
-    analyze_large_data()
+    parser = argparse.ArgumentParser(description="Uniswap big data fee-tier analysis")
+    parser.add_argument('--no-plots', action='store_true', help='compute the aggregates without drawing the chart')
+    parser.add_argument('--no-store', action='store_true', help='parse the CSV instead of using the column store')
+    parser.add_argument('--rolling', action='store_true', help='report peak rolling 1h/24h/7d volume per tier')
+    parser.add_argument('--whales', type=int, default=0, metavar='K',
+                        help='report the top K swaps per month and tier and their fee revenue share')
+    parser.add_argument('--approx', action='store_true',
+                        help='estimate the tables (with 95%% CIs) from a persisted stratified sample')
+    parser.add_argument('--sample-rows', type=int, default=SAMPLE_ROWS, help='sampled swaps per month and tier')
+    args = parser.parse_args()
+    analyze_large_data(plots=not args.no_plots, use_store=not args.no_store, rolling=args.rolling,
+                       whales=args.whales, approx=args.approx, sample_rows=args.sample_rows)
@@ -1,8 +1,13 @@
+import os
+import sys
 import requests
 import pandas as pd
 import json
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import stage
+
 # Define the Graph API endpoint for Uniswap V3
 # This is the public subgraph URL
 URL = "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3"
@@ -60,7 +65,7 @@ def clean_data(raw_data):
     return df
 
 
-def analyze_efficiency():
+def analyze_efficiency(data_file='Data/uniswap_sample_data.csv', output_path='assets/plots/web3_apr.png'):
     print("Fetching data from Uniswap V3 Subgraph...")
     
     results = {}
@@ -71,61 +76,67 @@ def analyze_efficiency():
         raise Exception("API Endpoint Deprecated") 
     except Exception as e:
         print(f"Notice: API usage failed ({str(e)}). Loading local sample data...")
-        df_all = pd.read_csv('Data/uniswap_sample_data.csv')
-        df_all['date'] = pd.to_datetime(df_all['date'])
+        with stage('load') as s:
+            df_all = pd.read_csv(data_file)
+            df_all['date'] = pd.to_datetime(df_all['date'])
+            s['rows'] = len(df_all)
     
-    for tier, address in POOLS.items():
-        print(f"Analyzing {tier} pool...")
+    with stage('analyze', rows=len(df_all)):
+        for tier, address in POOLS.items():
+            print(f"Analyzing {tier} pool...")
         
-        # Filter from the dataset (whether API or Local)
-        # If API worked, we would have data here. Since we are using sample now:
-        df = df_all[df_all['pool_id'] == address].copy()
+            # Filter from the dataset (whether API or Local)
+            # If API worked, we would have data here. Since we are using sample now:
+            df = df_all[df_all['pool_id'] == address].copy()
         
-        if df.empty:
-            print(f"No data for {tier}")
-            continue
+            if df.empty:
+                print(f"No data for {tier}")
+                continue
             
-        # Analysis Logic
-        # Daily Return = fees collected / TVL
-        df['daily_return'] = df['feesUSD'] / df['tvlUSD']
+            # Analysis Logic
+            # Daily Return = fees collected / TVL
+            df['daily_return'] = df['feesUSD'] / df['tvlUSD']
         
-        # Calculate annualized return
-        df['apr'] = df['daily_return'] * 365 * 100
+            # Calculate annualized return
+            df['apr'] = df['daily_return'] * 365 * 100
         
-        results[tier] = df
+            results[tier] = df
         
-        print(f"Stats for {tier} Pool:")
-        print(f"Average APR: {df['apr'].mean():.2f}%")
-        print(f"Total Volume: ${df['volumeUSD'].sum():,.0f}")
-        print("-" * 30)
+            print(f"Stats for {tier} Pool:")
+            print(f"Average APR: {df['apr'].mean():.2f}%")
+            print(f"Total Volume: ${df['volumeUSD'].sum():,.0f}")
+            print("-" * 30)
 
-    # Visualization
-    import matplotlib.pyplot as plt
+    with stage('render'):
+        # Visualization
+        import matplotlib.pyplot as plt
     
-    plt.style.use('dark_background')
-    fig, ax = plt.subplots(figsize=(10, 6))
+        plt.style.use('dark_background')
+        fig, ax = plt.subplots(figsize=(10, 6))
     
-    colors = {'0.05%': '#2a9d8f', '0.3%': '#e9c46a'}
+        colors = {'0.05%': '#2a9d8f', '0.3%': '#e9c46a'}
     
-    for tier, df in results.items():
-        # Rolling 7-day APR to smooth out noise
-        df['rolling_apr'] = df['apr'].rolling(window=7).mean()
-        ax.plot(df['date'], df['rolling_apr'], label=f"Fee Tier {tier}", color=colors[tier], linewidth=2)
+        for tier, df in results.items():
+            # Rolling 7-day APR to smooth out noise
+            df['rolling_apr'] = df['apr'].rolling(window=7).mean()
+            ax.plot(df['date'], df['rolling_apr'], label=f"Fee Tier {tier}", color=colors[tier], linewidth=2)
         
-    ax.set_title('Liquidity Provider Profitability (7-Day Rolling APR)', color='white', fontsize=14, pad=20)
-    ax.set_ylabel('Annualized Return (%)', color='#a0a0a0')
-    ax.legend()
+        ax.set_title('Liquidity Provider Profitability (7-Day Rolling APR)', color='white', fontsize=14, pad=20)
+        ax.set_ylabel('Annualized Return (%)', color='#a0a0a0')
+        ax.legend()
     
-    # Customizing look
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['bottom'].set_color('#404040')
-    ax.spines['left'].set_color('#404040')
-    ax.grid(True, axis='y', linestyle='--', alpha=0.2)
+        # Customizing look
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['bottom'].set_color('#404040')
+        ax.spines['left'].set_color('#404040')
+        ax.grid(True, axis='y', linestyle='--', alpha=0.2)
     
-    plt.tight_layout()
-    plt.savefig('assets/plots/web3_apr.png', dpi=150, transparent=False, facecolor='#0a0a0b')
-    print("Chart saved: assets/plots/web3_apr.png")
+        plt.tight_layout()
+
+    with stage('save'):
+        plt.savefig(output_path, dpi=150, transparent=False, facecolor='#0a0a0b')
+    print(f"Chart saved: {output_path}")
         
     return results
 
@@ -0,0 +1,231 @@
+"""
+Benchmark Suite
+Times the analysis hot paths at several data scales and records wall time and
+peak memory per case to benchmarks/results/<commit>.jsonl, so runs on different
+commits can be compared.
+
+Each case builds its inputs from the existing generators in one spawned
+process (not timed), then runs in a second fresh process: the module is
+imported, the inputs are received, and the hot path runs under tracemalloc.
+peak_rss_mb is that second process's peak, so it covers the imports, the
+inputs and the run, but not the memory used to generate the inputs.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # all cases, 10k/1M/10M
+    python benchmarks/run_benchmarks.py --scales 10k 1M --cases str_generate_aggregate
+    python benchmarks/run_benchmarks.py --compare             # latest result per commit
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+for path in ['', 'analysis', 'str_reports', os.path.join('defi_analysis', 'scripts')]:
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, path))
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+
+# --- Cases: setup(rows, workdir) -> kwargs (not timed), run(**kwargs) (timed) ---
+
+def setup_generate_large_dataset(rows, workdir):
+    return {'num_rows': rows, 'filename': os.path.join(workdir, 'transactions.csv')}
+
+def run_generate_large_dataset(num_rows, filename):
+    from generate_big_data import generate_large_dataset
+    generate_large_dataset(num_rows=num_rows, filename=filename)
+
+def setup_analyze_large_data(rows, workdir):
+    from generate_big_data import generate_large_dataset
+    data_file = os.path.join(workdir, 'transactions.csv')
+    generate_large_dataset(num_rows=rows, filename=data_file)
+    return {'data_file': data_file, 'output_path': os.path.join(workdir, 'big_data.png')}
+
+def run_analyze_large_data(data_file, output_path):
+    from uniswap_big_data import analyze_large_data
+    analyze_large_data(data_file=data_file, output_path=output_path)
+
+def setup_analyze_efficiency(rows, workdir):
+    import numpy as np
+    import pandas as pd
+    from uniswap_data import POOLS
+    rng = np.random.default_rng(42)
+    per_pool = rows // len(POOLS)
+    frames = []
+    for address in POOLS.values():
+        tvl = rng.uniform(1e8, 3e8, per_pool)
+        volume = rng.uniform(1e8, 1e9, per_pool)
+        frames.append(pd.DataFrame({
+            'date': pd.date_range('2000-01-01', periods=per_pool, freq='min'),
+            'volumeUSD': volume,
+            'feesUSD': volume * 0.0005,
+            'tvlUSD': tvl,
+            'pool_id': address,
+        }))
+    data_file = os.path.join(workdir, 'pool_days.csv')
+    pd.concat(frames).to_csv(data_file, index=False)
+    return {'data_file': data_file, 'output_path': os.path.join(workdir, 'apr.png')}
+
+def run_analyze_efficiency(data_file, output_path):
+    from uniswap_data import analyze_efficiency
+    analyze_efficiency(data_file=data_file, output_path=output_path)
+
+def setup_str_generate_aggregate(rows, workdir):
+    from generate_str_data import build_synthetic_portfolio
+    years = (2024, 2025)
+    return {'config': build_synthetic_portfolio(max(1, math.ceil(rows / (365 * len(years)))), years=years)}
+
+def run_str_generate_aggregate(config):
+    from generate_str_data import generate_portfolio, aggregate_to_monthly
+    daily = generate_portfolio(config, workers=1)
+    aggregate_to_monthly(daily)
+
+def setup_hedonic_features(rows, workdir):
+    import numpy as np
+    rng = np.random.default_rng(42)
+    descriptions = np.array(['Deluxe Room 35sqm ocean view', 'Suite 80 sqm with living room',
+                             'Standard Twin', 'Pool Villa 120sqm garden', 'Club Room 40 sqm balcony'], dtype=object)
+    inclusions = np.array(['Breakfast included', 'Room only', 'Executive lounge access', 'Half board meal plan'],
+                          dtype=object)
+    return {'descriptions': rng.choice(descriptions, rows), 'inclusions': rng.choice(inclusions, rows)}
+
+def run_hedonic_features(descriptions, inclusions):
+    from hedonic_pricing import extract_features
+    extract_features(descriptions, inclusions)
+
+def setup_clean_data(rows, workdir):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(42)
+    chains = np.array(['Ethereum', 'Ethereum, Arbitrum', 'Ethereum, Base, Optimism, Polygon', 'Solana'], dtype=object)
+    raw = pd.DataFrame({
+        'name': [f'Protocol {i}' for i in range(rows)],
+        'category': rng.choice(['Lending', 'Dexs', 'CEX', ' Liquid Staking ', None], rows),
+        'chains': rng.choice(chains, rows),
+        'tvl': np.sort(rng.lognormal(18, 3, rows))[::-1],
+    })
+    raw_path = os.path.join(workdir, 'raw.csv')
+    raw.to_csv(raw_path, index=False)
+    return {'raw_path': raw_path, 'cleaned_path': os.path.join(workdir, 'cleaned.csv')}
+
+def run_clean_data(raw_path, cleaned_path):
+    from clean_data import clean_data
+    clean_data(raw_path=raw_path, cleaned_path=cleaned_path)
+
+# case -> (module imported before timing, setup, run)
+CASES = {
+    'generate_large_dataset': ('generate_big_data', setup_generate_large_dataset, run_generate_large_dataset),
+    'analyze_large_data': ('uniswap_big_data', setup_analyze_large_data, run_analyze_large_data),
+    'analyze_efficiency': ('uniswap_data', setup_analyze_efficiency, run_analyze_efficiency),
+    'str_generate_aggregate': ('generate_str_data', setup_str_generate_aggregate, run_str_generate_aggregate),
+    'hedonic_features': ('hedonic_pricing', setup_hedonic_features, run_hedonic_features),
+    'clean_data': ('clean_data', setup_clean_data, run_clean_data),
+}
+
+def _setup_case(case, rows, workdir):
+    """Child process: build the case's inputs in `workdir`; returns the run kwargs"""
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return CASES[case][1](rows, workdir)
+
+def _run_case(case, kwargs):
+    """Child process: time the hot path under tracemalloc (inputs come from _setup_case)"""
+    import contextlib
+    import importlib
+    import io
+    import matplotlib
+    matplotlib.use('Agg')
+
+    module, _, run = CASES[case]
+    with contextlib.redirect_stdout(io.StringIO()):
+        importlib.import_module(module)
+        tracemalloc.start()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        run(**kwargs)
+        wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'seconds': round(wall, 4),
+        'cpu_seconds': round(cpu, 4),
+        'peak_tracemalloc_mb': round(peak / 2**20, 2),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+    }
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_benchmarks(cases, scales):
+    """Run every case x scale in its own process and append results"""
+    commit = current_commit()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_path = os.path.join(RESULTS_DIR, f'{commit}.jsonl')
+    context = multiprocessing.get_context('spawn')
+
+    print(f"{'case':<26}{'rows':>8}{'seconds':>10}{'peak MB':>10}{'rss MB':>10}")
+    for case in cases:
+        for label in scales:
+            # Setup and run in separate processes, so the run's peak RSS excludes setup
+            with tempfile.TemporaryDirectory() as workdir:
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        kwargs = pool.submit(_setup_case, case, SCALES[label], workdir).result()
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        metrics = pool.submit(_run_case, case, kwargs).result()
+                except Exception as e:
+                    print(f"{case:<26}{label:>8}  failed: {e}")
+                    continue
+            record = {'commit': commit, 'case': case, 'scale': label, 'rows': SCALES[label],
+                      'timestamp': datetime.now().isoformat(timespec='seconds'),
+                      'python': sys.version.split()[0], **metrics}
+            with open(results_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            print(f"{case:<26}{label:>8}{metrics['seconds']:>10.3f}"
+                  f"{metrics['peak_tracemalloc_mb']:>10.1f}{metrics['peak_rss_mb']:>10.1f}")
+    print(f"\nResults appended to {results_path}")
+
+def compare_results():
+    """Print the latest seconds per case/scale for every recorded commit"""
+    import pandas as pd
+    records = []
+    for name in sorted(os.listdir(RESULTS_DIR)) if os.path.isdir(RESULTS_DIR) else []:
+        with open(os.path.join(RESULTS_DIR, name)) as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    if not records:
+        print("No benchmark results recorded yet.")
+        return
+    df = pd.DataFrame(records).sort_values('timestamp')
+    latest = df.groupby(['case', 'scale', 'commit'])['seconds'].last().unstack('commit')
+    print(latest.to_string())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark analysis hot paths")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['10k', '1M', '10M'])
+    parser.add_argument('--compare', action='store_true', help='compare recorded results across commits')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results()
+    else:
+        run_benchmarks(args.cases, args.scales)
@@ -6,6 +6,7 @@ Creates publication-quality charts for the portfolio
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,13 +14,18 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 CLEANED_DATA = os.path.join(PROJECT_ROOT, '02_cleaned_data', 'defillama_tvl_cleaned.csv')
 VIZ_DIR = os.path.join(PROJECT_ROOT, '03_visualizations')
 
+sys.path.insert(0, os.path.dirname(PROJECT_ROOT))
+from instrumentation import instrument
+
 # Set style
 plt.style.use('dark_background')
 
+@instrument('load')
 def load_data():
     """Load cleaned data"""
     return pd.read_csv(CLEANED_DATA)
 
+@instrument()
 def create_top10_chart(df):
     """Bar chart of top 10 protocols"""
     top10 = df.head(10)
@@ -46,6 +52,7 @@ def create_top10_chart(df):
     print("✅ Created: top10_protocols.png")
     plt.close()
 
+@instrument()
 def create_category_chart(df):
     """Pie chart of categories"""
     category_tvl = df.groupby('category')['tvl_billions'].sum().sort_values(ascending=False)
@@ -69,6 +76,7 @@ def create_category_chart(df):
     print("✅ Created: category_distribution.png")
     plt.close()
 
+@instrument()
 def create_chain_comparison(df):
     """Multi-chain vs single-chain protocols"""
     multi_chain_tvl = df[df['is_multi_chain']]['tvl_billions'].sum()
@@ -5,6 +5,7 @@ Cleans and enriches the raw DeFiLlama data
 
 import pandas as pd
 import os
+import sys
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,10 +13,14 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 RAW_DATA = os.path.join(PROJECT_ROOT, '01_raw_data', 'defillama_tvl_raw.csv')
 CLEANED_DATA = os.path.join(PROJECT_ROOT, '02_cleaned_data', 'defillama_tvl_cleaned.csv')
 
-def clean_data():
+sys.path.insert(0, os.path.dirname(PROJECT_ROOT))
+from instrumentation import instrument
+
+@instrument('clean')
+def clean_data(raw_path=RAW_DATA, cleaned_path=CLEANED_DATA):
     """Load and clean the raw data"""
     print("📂 Loading raw data...")
-    df = pd.read_csv(RAW_DATA)
+    df = pd.read_csv(raw_path)
     
     print(f"Original dataset: {len(df)} protocols")
     
@@ -47,8 +52,8 @@ def clean_data():
     print(f"📊 Coverage: {df_top['market_share_pct'].sum():.2f}% of total market")
     
     # Save cleaned data
-    df_top.to_csv(CLEANED_DATA, index=False)
-    print(f"\n✅ Cleaned data saved to: {CLEANED_DATA}")
+    df_top.to_csv(cleaned_path, index=False)
+    print(f"\n✅ Cleaned data saved to: {cleaned_path}")
     
     # Show some stats
     print("\n📈 Category Breakdown (Top 100):")
@@ -7,14 +7,19 @@ import requests
 import pandas as pd
 from datetime import datetime
 import os
+import sys
 
 # Get the project root directory (2 levels up from this script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 
+sys.path.insert(0, os.path.dirname(PROJECT_ROOT))
+from instrumentation import instrument
+
 # DeFiLlama API endpoint
 API_URL = "https://api.llama.fi/protocols"
 
+@instrument('fetch')
 def fetch_protocol_data():
     """Fetch all protocol data from DeFiLlama"""
     print("Fetching data from DeFiLlama API...")
@@ -32,6 +37,7 @@ def fetch_protocol_data():
         print(f"❌ Error fetching data: {e}")
         return []
 
+@instrument('save')
 def save_raw_data(protocols):
     """Save raw data to CSV"""
     # Extract key fields
@@ -39,6 +45,7 @@ def save_raw_data(protocols):
     for protocol in protocols:
         data.append({
             'name': protocol.get('name', 'Unknown'),
+            'slug': protocol.get('slug', ''),
             'symbol': protocol.get('symbol', ''),
             'category': protocol.get('category', 'Other'),
             'chains': ', '.join(protocol.get('chains', [])),
@@ -0,0 +1,196 @@
+"""
+DeFi Protocol Analysis: Step 1b - Historical TVL
+Fetches the daily TVL history of the top-N protocols in defillama_tvl_cleaned.csv
+from the DeFiLlama /protocol/<slug> endpoint and writes one compact CSV per
+protocol:
+
+    01_raw_data/tvl_history/<slug>.csv      date,tvl   (YYYY-MM-DD, whole USD)
+
+Requests run concurrently on asyncio with two limits:
+    - a semaphore caps the requests in flight (--concurrency)
+    - a token bucket caps the request rate (--rate per second, bursts up to
+      --concurrency), shared by retries
+requests.get runs in a thread pool sized to the concurrency limit. 429 and 5xx
+answers are retried with exponential backoff (honouring Retry-After).
+
+Each file is written to a temp file and renamed into place, so an interrupted
+run leaves no partial series; re-running skips protocols that already have a
+file and fetches only the rest (--refresh fetches everything again).
+
+Offline benchmark against the local stub server (tvl_stub_server.py):
+    python defi_analysis/scripts/fetch_tvl_history.py --stub --top 100 --out /tmp/tvl_history
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+import requests
+
+# Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+CLEANED_DATA = os.path.join(PROJECT_ROOT, '02_cleaned_data', 'defillama_tvl_cleaned.csv')
+HISTORY_DIR = os.path.join(PROJECT_ROOT, '01_raw_data', 'tvl_history')
+
+sys.path.insert(0, os.path.dirname(PROJECT_ROOT))
+from instrumentation import instrument
+
+# DeFiLlama API
+API_BASE = "https://api.llama.fi"
+TOP_N = 50
+CONCURRENCY = 8
+RATE = 5.0                      # requests per second
+RETRIES = 3
+BACKOFF = 1.0                   # seconds, doubled per retry
+TIMEOUT = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def protocol_slug(name):
+    """DeFiLlama slug for a protocol name: lower case, spaces -> dashes, no apostrophes"""
+    return str(name).strip().lower().replace(' ', '-').replace("'", '')
+
+def load_protocols(path=CLEANED_DATA, top=TOP_N):
+    """Top protocols by TVL as [(name, slug)]; uses the API slug column when the data has it"""
+    df = pd.read_csv(path).sort_values('tvl', ascending=False).head(top)
+    slugs = df['slug'] if 'slug' in df.columns else pd.Series(index=df.index, dtype=object)
+    return [(name, slug if isinstance(slug, str) and slug else protocol_slug(name))
+            for name, slug in zip(df['name'], slugs)]
+
+def history_path(slug, out_dir=HISTORY_DIR):
+    return os.path.join(out_dir, slug.replace('/', '-') + '.csv')
+
+def daily_tvl(payload):
+    """Compact daily series from a /protocol payload: one row per UTC day (last point wins)"""
+    points = pd.DataFrame(payload.get('tvl') or [], columns=['date', 'totalLiquidityUSD'])
+    points = points.dropna()
+    days = pd.to_datetime(points['date'], unit='s').dt.strftime('%Y-%m-%d')
+    series = pd.DataFrame({'date': days, 'tvl': points['totalLiquidityUSD'].round().astype('int64')})
+    return series.drop_duplicates('date', keep='last').sort_values('date').reset_index(drop=True)
+
+def write_history(series, path):
+    """Write a series atomically (temp file, then rename)"""
+    tmp_path = path + '.tmp'
+    series.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def new_bucket(rate=RATE, burst=CONCURRENCY):
+    """Token bucket state: `rate` tokens per second, holding at most `burst`"""
+    return {'rate': rate, 'burst': burst, 'tokens': float(burst), 'updated': time.monotonic()}
+
+async def take_token(bucket):
+    """Wait until the bucket has a token and take it"""
+    while True:
+        now = time.monotonic()
+        bucket['tokens'] = min(bucket['burst'], bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+        bucket['updated'] = now
+        if bucket['tokens'] >= 1:
+            bucket['tokens'] -= 1
+            return
+        await asyncio.sleep((1 - bucket['tokens']) / bucket['rate'])
+
+def _get(url):
+    """Blocking GET (run in a worker thread): (status, payload or None, Retry-After)"""
+    response = requests.get(url, timeout=TIMEOUT)
+    payload = response.json() if response.status_code == 200 else None
+    return response.status_code, payload, response.headers.get('Retry-After')
+
+async def fetch_history(name, slug, base_url, out_dir, semaphore, bucket, retries=RETRIES):
+    """Fetch and write one protocol's history; returns 'fetched', 'missing' or 'failed'"""
+    url = f"{base_url.rstrip('/')}/protocol/{quote(slug)}"
+    async with semaphore:
+        for attempt in range(retries + 1):
+            await take_token(bucket)
+            try:
+                status, payload, retry_after = await asyncio.to_thread(_get, url)
+            except (requests.RequestException, ValueError) as e:
+                status, payload, retry_after = None, None, None
+                error = e
+            else:
+                error = f"HTTP {status}"
+            if status == 200:
+                break
+            if status == 404:
+                print(f"  ⚠️  {name}: no history at {url}")
+                return 'missing'
+            if status is not None and status not in RETRY_STATUS or attempt == retries:
+                print(f"  ❌ {name}: {error}")
+                return 'failed'
+            delay = BACKOFF * 2 ** attempt
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+
+    series = daily_tvl(payload)
+    write_history(series, history_path(slug, out_dir))
+    return 'fetched'
+
+async def ingest_async(protocols, base_url, out_dir, concurrency, rate, retries):
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = new_bucket(rate, burst=concurrency)
+    tasks = [fetch_history(name, slug, base_url, out_dir, semaphore, bucket, retries)
+             for name, slug in protocols]
+    return await asyncio.gather(*tasks)
+
+@instrument('fetch_history')
+def ingest_history(protocols, base_url=API_BASE, out_dir=HISTORY_DIR, concurrency=CONCURRENCY,
+                   rate=RATE, retries=RETRIES, refresh=False):
+    """Fetch the daily TVL history of `protocols` ([(name, slug)]) into `out_dir`.
+
+    Protocols that already have a file are skipped unless `refresh`.
+    Returns {'fetched', 'skipped', 'missing', 'failed', 'seconds'}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    todo = [(name, slug) for name, slug in protocols
+            if refresh or not os.path.exists(history_path(slug, out_dir))]
+    summary = {'fetched': 0, 'skipped': len(protocols) - len(todo), 'missing': 0, 'failed': 0}
+
+    start = time.perf_counter()
+    if todo:
+        for result in asyncio.run(ingest_async(todo, base_url, out_dir, concurrency, rate, retries)):
+            summary[result] += 1
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch daily TVL history for the top DeFi protocols")
+    parser.add_argument('--top', type=int, default=TOP_N, help='protocols to fetch, by current TVL')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help='requests in flight')
+    parser.add_argument('--rate', type=float, default=RATE, help='requests per second')
+    parser.add_argument('--retries', type=int, default=RETRIES)
+    parser.add_argument('--base-url', default=API_BASE, help='API base URL (e.g. a local stub)')
+    parser.add_argument('--out', default=HISTORY_DIR, help='output directory')
+    parser.add_argument('--refresh', action='store_true', help='fetch protocols that already have a file')
+    parser.add_argument('--stub', action='store_true', help='serve a local stub API and fetch from it')
+    parser.add_argument('--stub-latency', type=float, default=0.05, help='stub seconds per request')
+    args = parser.parse_args()
+
+    server = None
+    if args.stub:
+        from tvl_stub_server import start_server
+        server, args.base_url = start_server(latency=args.stub_latency)
+
+    protocols = load_protocols(top=args.top)
+    print(f"📈 Fetching TVL history for {len(protocols)} protocols from {args.base_url}")
+    print(f"   concurrency {args.concurrency}, {args.rate:g} req/s")
+    summary = ingest_history(protocols, args.base_url, args.out, args.concurrency,
+                             args.rate, args.retries, args.refresh)
+
+    print(f"✅ Fetched {summary['fetched']}, skipped {summary['skipped']} existing, "
+          f"{summary['missing']} missing, {summary['failed']} failed in {summary['seconds']:.1f}s")
+    if summary['fetched']:
+        print(f"⚡ {summary['fetched'] / summary['seconds']:.1f} protocols/s")
+    print(f"📁 Series saved to: {args.out}")
+    if server is not None:
+        server.shutdown()
+        stats = server.RequestHandlerClass.stats
+        print(f"🧪 Stub: {stats['requests']} requests, peak {stats['max_in_flight']} in flight")
@@ -0,0 +1,105 @@
+"""
+DeFi Protocol Analysis: DeFiLlama Stub Server
+Local stand-in for the DeFiLlama /protocol/<slug> history endpoint, so
+fetch_tvl_history.py can be run and benchmarked offline.
+
+Every slug gets a deterministic synthetic daily TVL series (seeded from the
+slug) in the same shape as the real payload. Each request waits `latency`
+seconds to mimic network time, and a fraction of requests can be answered
+with 429 to exercise retries. The server counts requests and the peak number
+in flight, which shows whether the client's concurrency limit held.
+
+Usage:
+    python defi_analysis/scripts/tvl_stub_server.py --port 8765 --latency 0.1
+    python defi_analysis/scripts/fetch_tvl_history.py --base-url http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import numpy as np
+
+DAYS = 730
+LATENCY = 0.05
+
+def synthetic_history(slug, days=DAYS):
+    """DeFiLlama-shaped payload with `days` midnight points plus a current (intraday) point"""
+    rng = np.random.default_rng(zlib.crc32(slug.encode()))
+    now = int(datetime.now(timezone.utc).timestamp())
+    today = now - now % 86400
+    dates = today - 86400 * np.arange(days - 1, -1, -1)
+    tvl = np.exp(rng.uniform(16, 24) + np.cumsum(rng.normal(0, 0.03, days)))
+    points = [{'date': int(d), 'totalLiquidityUSD': float(v)} for d, v in zip(dates, tvl)]
+    points.append({'date': now, 'totalLiquidityUSD': float(tvl[-1] * rng.normal(1, 0.01))})
+    return {'name': slug, 'slug': slug, 'tvl': points}
+
+def make_handler(latency=LATENCY, days=DAYS, error_rate=0.0):
+    """Request handler class serving /protocol/<slug>"""
+    stats = {'requests': 0, 'throttled': 0, 'in_flight': 0, 'max_in_flight': 0}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats['requests'] += 1
+                stats['in_flight'] += 1
+                stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+            try:
+                time.sleep(latency)
+                if not self.path.startswith('/protocol/'):
+                    return self._send(404, {'error': 'not found'})
+                if error_rate and random.random() < error_rate:
+                    with lock:
+                        stats['throttled'] += 1
+                    return self._send(429, {'error': 'rate limited'}, {'Retry-After': '0'})
+                self._send(200, synthetic_history(unquote(self.path[len('/protocol/'):]), days))
+            finally:
+                with lock:
+                    stats['in_flight'] -= 1
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    StubHandler.stats = stats
+    return StubHandler
+
+def start_server(port=0, latency=LATENCY, days=DAYS, error_rate=0.0):
+    """Serve in a daemon thread; returns (server, base_url). Stop with server.shutdown()"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency, days, error_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the DeFiLlama protocol history API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=LATENCY, help='seconds per request')
+    parser.add_argument('--days', type=int, default=DAYS, help='days of history per protocol')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency, args.days, args.error_rate)
+    print(f"🧪 Stub DeFiLlama API on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n📊 {server.RequestHandlerClass.stats}")
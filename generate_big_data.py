@@ -1,48 +1,63 @@
+import argparse
+import os
+import sys
 import pandas as pd
 import numpy as np
 import uuid
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis'))
+
 # Configuration
 NUM_ROWS = 1_000_000 # 1 Million transactions
 START_DATE = datetime(2025, 1, 1)
 
-def generate_large_dataset():
-    print(f"Generating {NUM_ROWS:,} transactions... (This might take a moment)")
+def generate_large_dataset(num_rows=NUM_ROWS, filename='Data/uniswap_large_transactions.csv', store=False):
+    print(f"Generating {num_rows:,} transactions... (This might take a moment)")
     
     # 1. Generate Dates (Random distribution over 1 year)
     # We use numpy to generate random seconds offset
-    offsets = np.random.randint(0, 31536000, NUM_ROWS) # Seconds in a year
+    offsets = np.random.randint(0, 31536000, num_rows) # Seconds in a year
     dates = [START_DATE + timedelta(seconds=int(x)) for x in offsets]
     dates.sort() # Sort by time
     
     # 2. Generate Amounts (Log-normal distribution to simulate real crypto: many small, few whales)
-    amounts = np.random.lognormal(mean=7, sigma=2, size=NUM_ROWS)
+    amounts = np.random.lognormal(mean=7, sigma=2, size=num_rows)
     # Clip to realistic ranges ($10 to $10M)
     amounts = np.clip(amounts, 10, 10_000_000)
     
     # 3. Generate Fee Tiers (Weighted: 0.05% matches high volume)
-    fee_tiers = np.random.choice(['0.05%', '0.3%', '1.0%'], size=NUM_ROWS, p=[0.7, 0.25, 0.05])
+    fee_tiers = np.random.choice(['0.05%', '0.3%', '1.0%'], size=num_rows, p=[0.7, 0.25, 0.05])
     
     # 4. Generate Gas Costs (Ethereum gas fluctuates)
-    gas_costs = np.random.normal(5, 2, size=NUM_ROWS) # Avg $5 gas
+    gas_costs = np.random.normal(5, 2, size=num_rows) # Avg $5 gas
     gas_costs = np.clip(gas_costs, 1, 50)
     
     # 5. Create DataFrame
     df = pd.DataFrame({
-        'transaction_hash': [str(uuid.uuid4()) for _ in range(NUM_ROWS)], # Unique IDs
+        'transaction_hash': [str(uuid.uuid4()) for _ in range(num_rows)], # Unique IDs
         'timestamp': dates,
         'amount_usd': amounts,
         'fee_tier': fee_tiers,
         'gas_cost_usd': gas_costs,
-        'slippage_impact': np.random.uniform(0.0001, 0.005, NUM_ROWS) # Random slippage
+        'slippage_impact': np.random.uniform(0.0001, 0.005, num_rows) # Random slippage
     })
     
     # Save to CSV
-    filename = 'Data/uniswap_large_transactions.csv'
     print(f"Saving to {filename}...")
     df.to_csv(filename, index=False)
+
+    # Optional memory-mapped column store, built from memory instead of re-parsing the CSV
+    if store:
+        from swap_schema import to_compact
+        from swap_store import store_path, write_store
+        print(f"Writing column store to {store_path(filename)}...")
+        write_store(to_compact(df), store_path(filename), filename)
     print("Done! Dataset ready.")
 
 if __name__ == "__main__":
-    generate_large_dataset()
+    parser = argparse.ArgumentParser(description="Generate the synthetic Uniswap transaction dataset")
+    parser.add_argument('--rows', type=int, default=NUM_ROWS)
+    parser.add_argument('--store', action='store_true', help='also write the memory-mapped column store')
+    args = parser.parse_args()
+    generate_large_dataset(args.rows, store=args.store)
@@ -0,0 +1,135 @@
+"""
+Stage Instrumentation
+Lightweight per-stage metrics for the analysis scripts: wall time, CPU time,
+peak RSS, tracemalloc peak (when tracing) and row counts, written as one JSON
+line per stage.
+
+    from instrumentation import stage, instrument
+
+    with stage('load') as s:
+        df = pd.read_csv(path)
+        s['rows'] = len(df)
+
+    @instrument('aggregate')
+    def aggregate(df): ...
+
+Environment:
+    STAGE_LOG           JSON-lines output file (default logs/stage_metrics.jsonl,
+                        '-' for stderr, 'off' to disable)
+    STAGE_TRACEMALLOC   set to 1 to trace Python allocations (adds overhead)
+    STAGE_PROFILE_DIR   if set, dump a cProfile .prof file per stage run there
+                        (<script>.<stage>.<pid>-<n>.prof, n counting repeats of a stage)
+"""
+
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG = os.path.join(PROJECT_ROOT, 'logs', 'stage_metrics.jsonl')
+
+_stack = []
+_profiling = False
+_profile_counts = {}
+
+if os.environ.get('STAGE_TRACEMALLOC') == '1' and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+def _script_name():
+    return os.path.splitext(os.path.basename(sys.argv[0] or 'interactive'))[0] or 'interactive'
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 2)
+
+def _emit(record):
+    target = os.environ.get('STAGE_LOG', DEFAULT_LOG)
+    if target == 'off':
+        return
+    line = json.dumps(record, default=str)
+    if target == '-':
+        print(line, file=sys.stderr)
+        return
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    with open(target, 'a') as f:
+        f.write(line + '\n')
+
+@contextmanager
+def stage(name, rows=None, **fields):
+    """Record metrics for the enclosed block.
+
+    Yields the record dict; set record['rows'] (or any extra field) inside the
+    block. After the block the record also holds the measured values, so
+    callers can reuse e.g. record['wall_s'].
+    """
+    global _profiling
+    record = {'script': _script_name(), 'stage': name, 'rows': rows, **fields}
+    parent = _stack[-1] if _stack else None
+    record['parent'] = parent['stage'] if parent else None
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        record['_child_peak'] = 0
+        # The reset below discards the parent's peak so far; keep it first
+        if parent is not None:
+            parent['_child_peak'] = max(parent.get('_child_peak', 0), tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    profiler = None
+    profile_dir = os.environ.get('STAGE_PROFILE_DIR')
+    if profile_dir and not _profiling:
+        profiler = cProfile.Profile()
+        _profiling = True
+        profiler.enable()
+
+    _stack.append(record)
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+        _stack.pop()
+
+        if profiler is not None:
+            profiler.disable()
+            _profiling = False
+            os.makedirs(profile_dir, exist_ok=True)
+            # Stages repeat (e.g. per market), so every run gets its own file
+            count = _profile_counts[name] = _profile_counts.get(name, 0) + 1
+            profile_path = os.path.join(profile_dir, f"{record['script']}.{name}.{os.getpid()}-{count}.prof")
+            profiler.dump_stats(profile_path)
+            record['profile'] = profile_path
+
+        record['wall_s'] = round(wall, 4)
+        record['cpu_s'] = round(cpu, 4)
+        record['peak_rss_mb'] = _peak_rss_mb()
+        if tracing:
+            peak = max(tracemalloc.get_traced_memory()[1], record.pop('_child_peak'))
+            record['peak_tracemalloc_mb'] = round(peak / 2**20, 2)
+            # Nested stages reset the peak; carry theirs up to the parent
+            if parent is not None:
+                parent['_child_peak'] = max(parent.get('_child_peak', 0), peak)
+        record['timestamp'] = datetime.now().isoformat(timespec='milliseconds')
+        record['pid'] = os.getpid()
+        _emit(record)
+
+def instrument(name=None):
+    """Decorator form of stage(); rows default to len() of the return value"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__) as record:
+                result = func(*args, **kwargs)
+                if record['rows'] is None and hasattr(result, '__len__') and not isinstance(result, (str, dict)):
+                    record['rows'] = len(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+/* Lightweight client-side line charts
+   Renders <div class="data-chart" data-src="assets/data/x.json"> elements from the
+   compact JSON written by analysis/chart_export.py. Falls back to data-fallback
+   (a PNG) if the data cannot be loaded. */
+
+const CHART_COLORS = ['#E97451', '#2A9D8F', '#F4A261', '#e9c46a', '#264653'];
+
+function drawChart(container, spec) {
+    let canvas = container.querySelector('canvas');
+    if (!canvas) {
+        canvas = document.createElement('canvas');
+        canvas.style.width = '100%';
+        canvas.style.height = '320px';
+        container.prepend(canvas);
+    }
+
+    const ratio = window.devicePixelRatio || 1;
+    const width = canvas.clientWidth;
+    const height = canvas.clientHeight;
+    canvas.width = width * ratio;
+    canvas.height = height * ratio;
+
+    const ctx = canvas.getContext('2d');
+    ctx.scale(ratio, ratio);
+    ctx.clearRect(0, 0, width, height);
+
+    const pad = { top: 40, right: 16, bottom: 28, left: 56 };
+    const plotW = width - pad.left - pad.right;
+    const plotH = height - pad.top - pad.bottom;
+
+    // Shared x (time) and y ranges across all series
+    const allX = spec.series.flatMap(s => s.x.map(d => Date.parse(d)));
+    const allY = spec.series.flatMap(s => s.y);
+    const minX = Math.min(...allX), maxX = Math.max(...allX);
+    const minY = Math.min(...allY), maxY = Math.max(...allY);
+    const spanX = (maxX - minX) || 1, spanY = (maxY - minY) || 1;
+    const px = x => pad.left + ((x - minX) / spanX) * plotW;
+    const py = y => pad.top + plotH - ((y - minY) / spanY) * plotH;
+
+    // Title and grid
+    ctx.font = '14px sans-serif';
+    ctx.fillStyle = '#ffffff';
+    ctx.fillText(spec.title, pad.left, 18);
+
+    ctx.strokeStyle = '#27272a';
+    ctx.fillStyle = '#a0a0a0';
+    ctx.font = '11px sans-serif';
+    ctx.setLineDash([4, 4]);
+    for (let i = 0; i <= 4; i++) {
+        const value = minY + (spanY * i) / 4;
+        const y = py(value);
+        ctx.beginPath();
+        ctx.moveTo(pad.left, y);
+        ctx.lineTo(pad.left + plotW, y);
+        ctx.stroke();
+        ctx.fillText(value.toFixed(1), 4, y + 4);
+    }
+    ctx.setLineDash([]);
+    ctx.fillText(new Date(minX).toISOString().slice(0, 10), pad.left, height - 8);
+    ctx.fillText(new Date(maxX).toISOString().slice(0, 10), pad.left + plotW - 64, height - 8);
+
+    // Series
+    spec.series.forEach((s, i) => {
+        ctx.strokeStyle = CHART_COLORS[i % CHART_COLORS.length];
+        ctx.lineWidth = i === 0 ? 2.5 : 1.5;
+        ctx.beginPath();
+        s.x.forEach((d, j) => {
+            const x = px(Date.parse(d)), y = py(s.y[j]);
+            j === 0 ? ctx.moveTo(x, y) : ctx.lineTo(x, y);
+        });
+        ctx.stroke();
+
+        // Legend
+        ctx.fillStyle = ctx.strokeStyle;
+        ctx.fillText(s.name, pad.left + plotW - 110, pad.top + 4 + i * 14);
+    });
+}
+
+document.querySelectorAll('.data-chart[data-src]').forEach(container => {
+    fetch(container.dataset.src)
+        .then(response => {
+            if (!response.ok) throw new Error(response.statusText);
+            return response.json();
+        })
+        .then(spec => {
+            drawChart(container, spec);
+            window.addEventListener('resize', () => drawChart(container, spec));
+        })
+        .catch(() => {
+            if (container.dataset.fallback) {
+                const img = document.createElement('img');
+                img.src = container.dataset.fallback;
+                img.alt = container.dataset.alt || '';
+                container.prepend(img);
+            }
+        });
+});
@@ -0,0 +1,25 @@
+"""
+Portfolio Plot Style
+Deferred matplotlib / seaborn setup shared by the analysis scripts. Importing
+pyplot and seaborn and applying the style costs ~1s, so scripts call pyplot()
+only when they actually draw; compute-only (--no-plots) runs never pay for it.
+
+    from plot_style import pyplot
+
+    plt, sns = pyplot()
+"""
+
+from functools import lru_cache
+
+COLORS = ["#E97451", "#2A9D8F", "#F4A261", "#264653", "#E76F51"]
+
+@lru_cache(maxsize=None)
+def pyplot(context="talk"):
+    """Import pyplot + seaborn on first use and apply the dark portfolio style"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('dark_background')
+    sns.set_context(context)
+    sns.set_palette(sns.color_palette(COLORS))
+    return plt, sns
@@ -1,23 +1,34 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from str_store import load_store, store_exists, list_markets
 
-# Set portfolio design style
-plt.style.use('dark_background')
-sns.set_context("talk")
-colors = ["#E97451", "#2A9D8F", "#F4A261", "#264653", "#E76F51"]
-sns.set_palette(sns.color_palette(colors))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import stage
+from plot_style import pyplot
 
-# Create output directory
-os.makedirs("visualizations", exist_ok=True)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
 
-def load_data(market):
-    """Load all datasets for a market"""
-    daily = pd.read_csv(f"data/{market}_daily_2024_2025.csv")
-    monthly = pd.read_csv(f"data/{market}_monthly_2024_2025.csv")
-    quarterly = pd.read_csv(f"data/{market}_quarterly_2024_2025.csv")
+# Daily columns used by the charts; only these are read from the store
+DAILY_COLUMNS = ['date', 'year', 'day_of_week', 'occupancy', 'adr', 'revpar']
+
+def load_data(market, year=None):
+    """Load all datasets for a market (columnar store, CSV fallback)"""
+    if store_exists():
+        daily = load_store('daily', market=market, year=year, columns=DAILY_COLUMNS)
+        monthly = load_store('monthly', market=market, year=year)
+        quarterly = load_store('quarterly', market=market, year=year)
+        return daily, monthly, quarterly
+    
+    daily = pd.read_csv(os.path.join(DATA_DIR, f"{market}_daily_2024_2025.csv"))
+    monthly = pd.read_csv(os.path.join(DATA_DIR, f"{market}_monthly_2024_2025.csv"))
+    quarterly = pd.read_csv(os.path.join(DATA_DIR, f"{market}_quarterly_2024_2025.csv"))
     
     daily['date'] = pd.to_datetime(daily['date'])
     
@@ -25,6 +36,7 @@ def load_data(market):
 
 def plot_absolute_performance(monthly, market):
     """Chart 1: Occupancy, ADR, RevPAR trends"""
+    plt = pyplot()[0]
     fig, axes = plt.subplots(3, 1, figsize=(14, 10))
     fig.patch.set_facecolor('#0a0a0b')
     
@@ -77,6 +89,7 @@ def plot_absolute_performance(monthly, market):
 
 def plot_str_indices(monthly, market):
     """Chart 2: STR Indices (MPI, ARI, RGI)"""
+    plt = pyplot()[0]
     fig, ax = plt.subplots(figsize=(14, 7))
     fig.patch.set_facecolor('#0a0a0b')
     
@@ -121,6 +134,7 @@ def plot_str_indices(monthly, market):
 
 def plot_yoy_comparison(monthly, market):
     """Chart 3: Year-over-Year Comparison"""
+    plt = pyplot()[0]
     fig, axes = plt.subplots(1, 3, figsize=(16, 5))
     fig.patch.set_facecolor('#0a0a0b')
     
@@ -178,6 +192,7 @@ def plot_yoy_comparison(monthly, market):
 
 def plot_day_of_week(daily, market):
     """Chart 4: Day-of-Week Performance"""
+    plt = pyplot()[0]
     daily_2025 = daily[daily['year'] == 2025].copy()
     
     dow_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
@@ -212,6 +227,7 @@ def plot_day_of_week(daily, market):
 
 def plot_segment_mix(monthly, market):
     """Chart 5: Segment Mix Analysis"""
+    plt = pyplot()[0]
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     fig.patch.set_facecolor('#0a0a0b')
     
@@ -261,6 +277,7 @@ def plot_segment_mix(monthly, market):
 
 def plot_market_gaps(monthly, market):
     """Chart 6: Market vs CompSet Gap Analysis"""
+    plt = pyplot()[0]
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     fig.patch.set_facecolor('#0a0a0b')
     
@@ -330,37 +347,90 @@ def generate_insights(monthly, market):
     
     return insights
 
+def print_insights(market, insights):
+    """Print the key insights block for one market"""
+    print(f"\n{market.upper()} KEY INSIGHTS:")
+    print(f"  2025 Avg Occupancy: {insights['avg_occupancy_2025']:.1f}%")
+    print(f"  2025 Avg ADR: {insights['avg_adr_2025']/1000000:.2f}M IDR")
+    print(f"  2025 Avg RevPAR: {insights['avg_revpar_2025']/1000000:.2f}M IDR")
+    print(f"  Avg RGI: {insights['avg_rgi_2025']:.1f} ({'Outperforming' if insights['avg_rgi_2025'] > 100 else 'Underperforming'})")
+    print(f"  YoY Occupancy Change: {insights['yoy_occ_change']:+.1f}pp")
+    print(f"  YoY ADR Change: {insights['yoy_adr_change_pct']:+.1f}%")
+    print(f"  YoY RevPAR Change: {insights['yoy_revpar_change_pct']:+.1f}%")
+    print(f"  Dominant Segment: {insights['dominant_segment']}")
+
+def process_market(market, plots=True):
+    """Load, plot and summarize one market; returns (market, insights, phase timings)"""
+    with stage('load', market=market) as load:
+        daily, monthly, quarterly = load_data(market)
+        load['rows'] = len(daily)
+    
+    timings = {'load': load['wall_s']}
+    if plots:
+        os.makedirs("visualizations", exist_ok=True)
+        with stage('plots', market=market, rows=len(daily)) as charts:
+            plot_absolute_performance(monthly, market)
+            plot_str_indices(monthly, market)
+            plot_yoy_comparison(monthly, market)
+            plot_day_of_week(daily, market)
+            plot_segment_mix(monthly, market)
+            plot_market_gaps(monthly, market)
+        timings['plots'] = charts['wall_s']
+    
+    with stage('insights', market=market, rows=len(monthly)) as summary:
+        insights = generate_insights(monthly, market)
+    timings['insights'] = summary['wall_s']
+    return market, insights, timings
+
+def run_markets(markets, workers=None, plots=True):
+    """Process markets concurrently and collect one consolidated report"""
+    start = time.perf_counter()
+    task = partial(process_market, plots=plots)
+    if workers == 1 or len(markets) == 1:
+        results = [task(market) for market in markets]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(task, markets))
+    wall = time.perf_counter() - start
+    
+    report = pd.DataFrame([dict(market=market, **insights) for market, insights, _ in results])
+    timings = pd.DataFrame([dict(market=market, **phases) for market, _, phases in results]).set_index('market')
+    return report, timings, wall
+
 # Main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="STR competitive analysis across markets")
+    parser.add_argument("markets", nargs="*", help="markets to process (default: every market in the store)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-plots", action="store_true", help="compute the insights report only")
+    args = parser.parse_args()
+    
+    markets = args.markets or (list_markets() if store_exists() else ['jakarta', 'bali'])
+    
     print("\n" + "="*70)
-    print("STR COMPETITIVE ANALYSIS - GENERATING VISUALIZATIONS")
+    mode = "INSIGHTS ONLY" if args.no_plots else "GENERATING VISUALIZATIONS"
+    print(f"STR COMPETITIVE ANALYSIS - {mode} ({len(markets)} markets)")
     print("="*70)
     
-    for market in ['jakarta', 'bali']:
-        print(f"\n[{market.upper()}] Loading data...")
-        daily, monthly, quarterly = load_data(market)
-        
-        print(f"[{market.upper()}] Generating visualizations...")
-        plot_absolute_performance(monthly, market)
-        plot_str_indices(monthly, market)
-        plot_yoy_comparison(monthly, market)
-        plot_day_of_week(daily, market)
-        plot_segment_mix(monthly, market)
-        plot_market_gaps(monthly, market)
-        
-        print(f"[{market.upper()}] Calculating insights...")
-        insights = generate_insights(monthly, market)
-        
-        print(f"\n{market.upper()} KEY INSIGHTS:")
-        print(f"  2025 Avg Occupancy: {insights['avg_occupancy_2025']:.1f}%")
-        print(f"  2025 Avg ADR: {insights['avg_adr_2025']/1000000:.2f}M IDR")
-        print(f"  2025 Avg RevPAR: {insights['avg_revpar_2025']/1000000:.2f}M IDR")
-        print(f"  Avg RGI: {insights['avg_rgi_2025']:.1f} ({'Outperforming' if insights['avg_rgi_2025'] > 100 else 'Underperforming'})")
-        print(f"  YoY Occupancy Change: {insights['yoy_occ_change']:+.1f}pp")
-        print(f"  YoY ADR Change: {insights['yoy_adr_change_pct']:+.1f}%")
-        print(f"  YoY RevPAR Change: {insights['yoy_revpar_change_pct']:+.1f}%")
-        print(f"  Dominant Segment: {insights['dominant_segment']}")
+    report, timings, wall = run_markets(markets, workers=args.workers, plots=not args.no_plots)
+    
+    for row in report.to_dict('records'):
+        print_insights(row['market'], row)
+    
+    os.makedirs("visualizations", exist_ok=True)
+    report_path = "visualizations/str_insights_report.csv"
+    report.to_csv(report_path, index=False)
+    
+    print("\n" + "="*70)
+    print("PHASE TIMINGS (seconds)")
+    print("="*70)
+    print(timings.round(2).to_string())
+    print(f"\n  Total per phase: " + ", ".join(f"{phase} {total:.2f}s" for phase, total in timings.sum().items()))
+    print(f"  Wall time: {wall:.2f}s ({args.workers or os.cpu_count()} workers)")
     
     print("\n" + "="*70)
-    print("✓ ANALYSIS COMPLETE - All visualizations saved to visualizations/")
+    if args.no_plots:
+        print(f"✓ ANALYSIS COMPLETE - report: {report_path}")
+    else:
+        print(f"✓ ANALYSIS COMPLETE - All visualizations saved to visualizations/, report: {report_path}")
     print("="*70)
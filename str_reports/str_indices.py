@@ -0,0 +1,113 @@
+"""
+STR Index Engine
+Computes compset averages and MPI / ARI / RGI for many properties against
+arbitrary, overlapping competitive sets.
+
+Daily data is held as dense date x property matrices of the additive measures
+(rooms sold, rooms available, room revenue). Compsets are a sparse
+compset x property membership matrix, so every compset total for every date is
+one sparse-dense product; each (property, compset) pair then subtracts the
+subject's own figures when it is a member of its compset. Compset averages
+are supply-weighted, as in STR reports: occupancy = sold / available,
+ADR = revenue / sold, RevPAR = revenue / available.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+MEASURES = ['rooms_sold', 'rooms_available', 'total_revenue']
+
+def build_cube(daily, property_col='property_name'):
+    """Pivot daily rows into dense date x property matrices, one per measure"""
+    cube = {}
+    for measure in MEASURES:
+        matrix = daily.pivot_table(index='date', columns=property_col, values=measure,
+                                   aggfunc='sum', fill_value=0)
+        cube[measure] = matrix.to_numpy(dtype=np.float64)
+    cube['dates'] = matrix.index
+    cube['properties'] = matrix.columns
+    return cube
+
+def build_membership(compsets, properties):
+    """Sparse compset x property 0/1 membership matrix for {name: [property ids]}"""
+    position = pd.Index(properties)
+    names = list(compsets)
+    rows, cols = [], []
+    for row, name in enumerate(names):
+        idx = position.get_indexer(list(compsets[name]))
+        if (idx < 0).any():
+            missing = [p for p, i in zip(compsets[name], idx) if i < 0]
+            raise KeyError(f"Compset {name!r} references unknown properties: {missing}")
+        rows.extend([row] * len(idx))
+        cols.extend(idx)
+    data = np.ones(len(rows), dtype=np.float64)
+    membership = sparse.csr_matrix((data, (rows, cols)), shape=(len(names), len(position)))
+    membership.sum_duplicates()
+    membership.data[:] = 1.0
+    return membership, names
+
+def compute_indices(cube, compsets, subjects=None):
+    """Compset averages and STR indices for every date and (property, compset) pair.
+
+    `subjects` is an iterable of (property, compset name) pairs; by default
+    every member of every compset is benchmarked against that compset (with
+    itself excluded). Returns a dict with a `pairs` DataFrame and one
+    (dates x pairs) matrix per metric.
+    """
+    membership, names = build_membership(compsets, cube['properties'])
+    property_pos = pd.Index(cube['properties'])
+    compset_pos = pd.Index(names)
+
+    if subjects is None:
+        coo = membership.tocoo()
+        order = np.lexsort((coo.col, coo.row))
+        c_idx, p_idx = coo.row[order], coo.col[order]
+    else:
+        subjects = list(subjects)
+        p_idx = property_pos.get_indexer([p for p, _ in subjects])
+        c_idx = compset_pos.get_indexer([c for _, c in subjects])
+        if (p_idx < 0).any() or (c_idx < 0).any():
+            raise KeyError("subjects reference unknown properties or compsets")
+
+    # Subject is removed from its own compset totals
+    is_member = np.asarray(membership[c_idx, p_idx]).ravel()
+
+    own, comp = {}, {}
+    for measure in MEASURES:
+        values = cube[measure]
+        totals = np.asarray((membership @ values.T).T)  # dates x compsets
+        own[measure] = values[:, p_idx]
+        comp[measure] = totals[:, c_idx] - own[measure] * is_member
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = {
+            'occupancy': own['rooms_sold'] / own['rooms_available'] * 100,
+            'adr': own['total_revenue'] / own['rooms_sold'],
+            'revpar': own['total_revenue'] / own['rooms_available'],
+            'compset_occupancy': comp['rooms_sold'] / comp['rooms_available'] * 100,
+            'compset_adr': comp['total_revenue'] / comp['rooms_sold'],
+            'compset_revpar': comp['total_revenue'] / comp['rooms_available'],
+        }
+        result['mpi'] = result['occupancy'] / result['compset_occupancy'] * 100
+        result['ari'] = result['adr'] / result['compset_adr'] * 100
+        result['rgi'] = result['revpar'] / result['compset_revpar'] * 100
+
+    result['dates'] = cube['dates']
+    result['pairs'] = pd.DataFrame({
+        'property': property_pos[p_idx],
+        'compset': compset_pos[c_idx],
+    })
+    return result
+
+def indices_frame(result, metrics=('mpi', 'ari', 'rgi')):
+    """Long-format DataFrame (date, property, compset, metrics...) from compute_indices()"""
+    n_dates, n_pairs = len(result['dates']), len(result['pairs'])
+    frame = pd.DataFrame({
+        'date': np.repeat(result['dates'], n_pairs),
+        'property': np.tile(result['pairs']['property'].to_numpy(), n_dates),
+        'compset': np.tile(result['pairs']['compset'].to_numpy(), n_dates),
+    })
+    for metric in metrics:
+        frame[metric] = result[metric].ravel()
+    return frame
@@ -0,0 +1,147 @@
+"""
+STR Rollup Engine
+Aggregates daily STR data to week / month / quarter / year (and custom periods)
+from declarative additive measures and derived-metric definitions.
+
+The daily data is scanned once into an additive base (one row per property per
+day). Month is rolled up from that base, quarter from month and year from
+quarter, so coarser levels never rescan the daily rows.
+"""
+
+import pandas as pd
+
+# Grouping keys shared by every level
+KEYS = ['property_name', 'market']
+
+# Additive measures: output column -> daily source column (summed)
+ADDITIVE_MEASURES = {
+    'rooms_sold': 'rooms_sold',
+    'rooms_available': 'rooms_available',
+    'total_revenue': 'total_revenue',
+    'revenue_transient': 'revenue_transient',
+    'revenue_group': 'revenue_group',
+    'revenue_contract': 'revenue_contract',
+    # CompSet / Market are reported as daily averages: sum + day count
+    'compset_occupancy_sum': 'compset_occupancy',
+    'compset_adr_sum': 'compset_adr',
+    'market_occupancy_sum': 'market_occupancy',
+    'market_adr_sum': 'market_adr',
+}
+
+# Attributes carried through unchanged (first value per group)
+ATTRIBUTES = ['total_rooms']
+
+# Derived metrics, evaluated in order on an additive table
+DERIVED_METRICS = [
+    ('occupancy', lambda t: round((t['rooms_sold'] / t['rooms_available']) * 100, 1)),
+    ('adr', lambda t: round(t['total_revenue'] / t['rooms_sold'], -3).astype(int)),
+    ('revpar', lambda t: round(t['adr'] * t['occupancy'] / 100, -3).astype(int)),
+
+    # Segment mix percentages
+    ('seg_transient_pct', lambda t: round((t['revenue_transient'] / t['total_revenue']) * 100, 1)),
+    ('seg_group_pct', lambda t: round((t['revenue_group'] / t['total_revenue']) * 100, 1)),
+    ('seg_contract_pct', lambda t: round((t['revenue_contract'] / t['total_revenue']) * 100, 1)),
+
+    # CompSet and Market
+    ('compset_occupancy', lambda t: (t['compset_occupancy_sum'] / t['days']).round(1)),
+    ('compset_adr', lambda t: (t['compset_adr_sum'] / t['days']).round(-3).astype(int)),
+    ('compset_revpar', lambda t: round(t['compset_adr'] * t['compset_occupancy'] / 100, -3).astype(int)),
+    ('market_occupancy', lambda t: (t['market_occupancy_sum'] / t['days']).round(1)),
+    ('market_adr', lambda t: (t['market_adr_sum'] / t['days']).round(-3).astype(int)),
+    ('market_revpar', lambda t: round(t['market_adr'] * t['market_occupancy'] / 100, -3).astype(int)),
+
+    # STR Indices
+    ('mpi', lambda t: round((t['occupancy'] / t['compset_occupancy']) * 100, 1)),
+    ('ari', lambda t: round((t['adr'] / t['compset_adr']) * 100, 1)),
+    ('rgi', lambda t: round((t['revpar'] / t['compset_revpar']) * 100, 1)),
+]
+
+# Built-in levels: name -> (parent level, function adding the period columns, period columns)
+LEVELS = {
+    'week': ('day', lambda t: t.assign(iso_year=t['date'].dt.isocalendar().year.astype(int),
+                                      week=t['date'].dt.isocalendar().week.astype(int)), ['iso_year', 'week']),
+    'month': ('day', lambda t: t, ['year', 'month']),
+    'quarter': ('month', lambda t: t.assign(quarter=(t['month'] - 1) // 3 + 1), ['year', 'quarter']),
+    'year': ('quarter', lambda t: t, ['year']),
+}
+
+def additive_columns():
+    """Summed columns of an additive table"""
+    return list(ADDITIVE_MEASURES) + ['days']
+
+def to_base(daily):
+    """Single scan of the daily data into the additive day-level base"""
+    source = daily[KEYS + ['date'] + ATTRIBUTES].copy()
+    for name, column in ADDITIVE_MEASURES.items():
+        source[name] = daily[column]
+    source['days'] = 1
+
+    agg = {name: 'sum' for name in additive_columns()}
+    agg.update({attr: 'first' for attr in ATTRIBUTES})
+    base = source.groupby(KEYS + ['date'], sort=True).agg(agg).reset_index()
+    base['year'] = base['date'].dt.year
+    base['month'] = base['date'].dt.month
+    return base[KEYS + ['date', 'year', 'month'] + ATTRIBUTES + additive_columns()]
+
+def rollup(additive, period_columns):
+    """Re-aggregate an additive table to coarser period columns"""
+    agg = {attr: 'first' for attr in ATTRIBUTES}
+    agg.update({name: 'sum' for name in additive_columns()})
+    return additive.groupby(KEYS + period_columns, sort=True).agg(agg).reset_index()
+
+def rollup_levels(daily, levels=('week', 'month', 'quarter', 'year'), custom=None, base=None):
+    """Compute additive tables for the requested levels.
+
+    `custom` maps a level name to a function date Series -> period label
+    Series; custom levels are rolled up from the day base. Returns a dict of
+    level name -> additive table (pass each through finalize()).
+    """
+    tables = {'day': to_base(daily) if base is None else base}
+
+    def build(level):
+        if level not in tables:
+            parent, add_period, period_columns = LEVELS[level]
+            build(parent)
+            tables[level] = rollup(add_period(tables[parent]), period_columns)
+        return tables[level]
+
+    result = {level: build(level) for level in levels}
+    for name, period_func in (custom or {}).items():
+        day = tables['day']
+        result[name] = rollup(day.assign(period=period_func(day['date'])), ['period'])
+    return result
+
+def finalize(additive):
+    """Evaluate the derived metrics on an additive table"""
+    table = additive.copy()
+    for name, func in DERIVED_METRICS:
+        table[name] = func(table)
+    return table
+
+MONTHLY_COLUMNS = ['property_name', 'market', 'year', 'month', 'month_name',
+                   'total_rooms', 'rooms_sold', 'rooms_available', 'occupancy', 'adr', 'revpar',
+                   'compset_occupancy', 'compset_adr', 'compset_revpar',
+                   'market_occupancy', 'market_adr', 'market_revpar',
+                   'mpi', 'ari', 'rgi',
+                   'seg_transient_pct', 'seg_group_pct', 'seg_contract_pct',
+                   'total_revenue', 'revenue_transient', 'revenue_group', 'revenue_contract']
+
+QUARTERLY_COLUMNS = ['property_name', 'market', 'year', 'quarter', 'total_rooms',
+                     'rooms_sold', 'rooms_available', 'total_revenue',
+                     'revenue_transient', 'revenue_group', 'revenue_contract',
+                     'compset_occupancy', 'compset_adr', 'market_occupancy', 'market_adr',
+                     'occupancy', 'adr', 'revpar',
+                     'seg_transient_pct', 'seg_group_pct', 'seg_contract_pct',
+                     'compset_revpar', 'market_revpar', 'mpi', 'ari', 'rgi', 'quarter_name']
+
+def monthly_table(additive):
+    """Published monthly report table from a monthly additive table"""
+    monthly = finalize(additive)
+    monthly['month_name'] = pd.to_datetime(monthly['year'].astype(str) + '-' + monthly['month'].astype(str) + '-01').dt.strftime('%B')
+    return monthly[MONTHLY_COLUMNS]
+
+def quarterly_table(additive):
+    """Published quarterly report table from a quarterly additive table"""
+    quarterly = finalize(additive)
+    quarterly['quarter_name'] = 'Q' + quarterly['quarter'].astype(str)
+    return quarterly[QUARTERLY_COLUMNS]
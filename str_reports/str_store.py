@@ -0,0 +1,209 @@
+"""
+STR Dataset Store
+Typed columnar (Parquet) store partitioned by granularity / market / year:
+
+    data/store/granularity=monthly/market=bali/year=2025/part-0.parquet
+
+The *_sums granularities hold the additive aggregates (room nights, revenue by
+segment, compset/market sums, day counts) that let append_daily() refresh a
+year's monthly and quarterly reports without touching any other partition.
+
+append_daily() writes each batch of daily rows as its own part file
+(part-1.parquet, part-2.parquet, ...) next to the partition's part-0; where a
+later part restates a property/day, the later row wins when the partition is
+read. Once a daily partition has DAILY_PART_LIMIT parts it is compacted back
+into a single part-0.
+
+Market and year filters are resolved against the directory layout, so only the
+matching partition files are opened; column filters are pushed into the Parquet
+reader, so only the requested column chunks are decoded.
+"""
+
+import os
+import pandas as pd
+from str_rollup import rollup, rollup_levels, additive_columns, monthly_table, quarterly_table
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(SCRIPT_DIR, 'data', 'store')
+
+GRANULARITIES = ['daily', 'monthly', 'quarterly', 'monthly_sums', 'quarterly_sums']
+DAILY_KEY = ['property_name', 'date']
+DAILY_PART_LIMIT = 32
+
+def partition_path(granularity, market, year, root=STORE_DIR):
+    """Directory holding one granularity/market/year partition"""
+    return os.path.join(root, f"granularity={granularity}", f"market={market.lower()}", f"year={int(year)}")
+
+def _part_number(filename):
+    return int(filename[len('part-'):-len('.parquet')])
+
+def partition_files(path):
+    """Part files of a partition directory, oldest first"""
+    if not os.path.isdir(path):
+        return []
+    parts = [f for f in os.listdir(path) if f.startswith('part-') and f.endswith('.parquet')]
+    return [os.path.join(path, f) for f in sorted(parts, key=_part_number)]
+
+def write_partition(df, granularity, market, year, root=STORE_DIR):
+    """Write (replace) a single partition"""
+    path = partition_path(granularity, market, year, root)
+    os.makedirs(path, exist_ok=True)
+    df.to_parquet(os.path.join(path, 'part-0.parquet'), index=False)
+    for stale in partition_files(path)[1:]:
+        os.remove(stale)
+    return path
+
+def write_store(frames, root=STORE_DIR):
+    """Write {granularity: DataFrame} into the store, one file per market/year"""
+    written = 0
+    for granularity, df in frames.items():
+        for (market, year), part in df.groupby(['market', 'year'], sort=True):
+            write_partition(part, granularity, market, year, root)
+            written += 1
+    return written
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, (str, int)):
+        return [value]
+    return list(value)
+
+def list_partition_dirs(granularity, market=None, year=None, root=STORE_DIR):
+    """Partition directories matching the market/year filters (pruned by path)"""
+    base = os.path.join(root, f"granularity={granularity}")
+    if not os.path.isdir(base):
+        return []
+
+    markets = _as_list(market)
+    years = _as_list(year)
+    wanted_markets = None if markets is None else {m.lower() for m in markets}
+    wanted_years = None if years is None else {int(y) for y in years}
+
+    dirs = []
+    for market_dir in sorted(os.listdir(base)):
+        market_name = market_dir.split('=', 1)[1]
+        if wanted_markets is not None and market_name not in wanted_markets:
+            continue
+        for year_dir in sorted(os.listdir(os.path.join(base, market_dir))):
+            if wanted_years is not None and int(year_dir.split('=', 1)[1]) not in wanted_years:
+                continue
+            path = os.path.join(base, market_dir, year_dir)
+            if partition_files(path):
+                dirs.append(path)
+    return dirs
+
+def list_partitions(granularity, market=None, year=None, root=STORE_DIR):
+    """Partition files matching the market/year filters (pruned by path)"""
+    return [f for path in list_partition_dirs(granularity, market, year, root) for f in partition_files(path)]
+
+def read_parts(files, columns=None, filters=None):
+    """Read a partition's part files; for several daily parts, later rows win per property/day"""
+    if len(files) == 1:
+        return pd.read_parquet(files[0], columns=columns, filters=filters)
+    read_columns = None if columns is None else list(dict.fromkeys(DAILY_KEY + list(columns)))
+    df = pd.concat([pd.read_parquet(f, columns=read_columns, filters=filters) for f in files], ignore_index=True)
+    df = df.drop_duplicates(DAILY_KEY, keep='last').sort_values(DAILY_KEY, ignore_index=True)
+    return df if columns is None else df[list(columns)]
+
+def load_store(granularity, market=None, year=None, columns=None, root=STORE_DIR):
+    """Load one granularity, reading only matching partitions and columns"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    dirs = list_partition_dirs(granularity, market, year, root)
+    if not dirs:
+        raise FileNotFoundError(f"No {granularity} partitions for market={market} year={year} in {root}")
+
+    frames = [read_parts(partition_files(path), columns) for path in dirs]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+def _read_partition(granularity, market, year, root=STORE_DIR):
+    files = partition_files(partition_path(granularity, market, year, root))
+    return read_parts(files) if files else None
+
+def daily_columns(new_daily, market, root=STORE_DIR):
+    """Column layout of the market's stored daily rows (the new rows' own columns if none are stored)"""
+    import pyarrow.parquet as pq
+
+    files = list_partitions('daily', market, root=root)
+    if files:
+        return pq.read_schema(files[0]).names
+    return list(new_daily.columns)
+
+def compact_daily(market, year, root=STORE_DIR):
+    """Merge a daily partition's part files into a single part-0"""
+    daily = _read_partition('daily', market, year, root)
+    if daily is not None:
+        write_partition(daily, 'daily', market, year, root)
+
+def _negate(additive):
+    negated = additive.copy()
+    columns = additive_columns()
+    negated[columns] = -negated[columns]
+    return negated
+
+def append_daily(new_daily, root=STORE_DIR):
+    """Append new daily rows and refresh the affected aggregates incrementally.
+
+    For each market/year the new rows fall in, the batch is written as a new
+    part file of the daily partition, and the monthly/quarterly additive sums
+    are updated by the delta of the new rows, net of any restated days they
+    replace (only those days are read back, through a date filter). The
+    monthly/quarterly reports are then recomputed from the sums. The cost
+    follows the batch size, not the stored history, apart from a compaction
+    of the daily partition every DAILY_PART_LIMIT appends. Returns the list
+    of (market, year) partitions touched.
+    """
+    new_daily = new_daily.copy()
+    new_daily['date'] = pd.to_datetime(new_daily['date'])
+    new_daily['year'] = new_daily['date'].dt.year
+    new_daily['month'] = new_daily['date'].dt.month
+    new_daily = new_daily.drop_duplicates(DAILY_KEY, keep='last')
+
+    touched = []
+    for (market, year), rows in new_daily.groupby(['market', 'year'], sort=True):
+        rows = rows[daily_columns(new_daily, market, root)].sort_values(DAILY_KEY, ignore_index=True)
+        path = partition_path('daily', market, year, root)
+        files = partition_files(path)
+        if files:
+            # Stored values of restated days, read back by date only
+            stored = read_parts(files, filters=[('date', 'in', list(rows['date'].unique()))])
+            matched = stored[DAILY_KEY].merge(rows[DAILY_KEY], on=DAILY_KEY, how='left', indicator=True)
+            replaced = stored[(matched['_merge'] == 'both').to_numpy()]
+        else:
+            replaced = rows.iloc[0:0]
+
+        os.makedirs(path, exist_ok=True)
+        part = _part_number(os.path.basename(files[-1])) + 1 if files else 0
+        rows.to_parquet(os.path.join(path, f'part-{part}.parquet'), index=False)
+        if len(files) + 1 >= DAILY_PART_LIMIT:
+            compact_daily(market, year, root)
+
+        monthly_sums = _read_partition('monthly_sums', market, year, root)
+        if monthly_sums is None:
+            monthly_sums = rollup_levels(_read_partition('daily', market, year, root), levels=('month',))['month']
+        else:
+            delta = [rollup_levels(rows, levels=('month',))['month']]
+            if len(replaced):
+                delta.append(_negate(rollup_levels(replaced, levels=('month',))['month']))
+            monthly_sums = rollup(pd.concat([monthly_sums] + delta, ignore_index=True), ['year', 'month'])
+        quarterly_sums = rollup(monthly_sums.assign(quarter=(monthly_sums['month'] - 1) // 3 + 1), ['year', 'quarter'])
+
+        write_partition(monthly_sums, 'monthly_sums', market, year, root)
+        write_partition(quarterly_sums, 'quarterly_sums', market, year, root)
+        write_partition(monthly_table(monthly_sums), 'monthly', market, year, root)
+        write_partition(quarterly_table(quarterly_sums), 'quarterly', market, year, root)
+        touched.append((market, int(year)))
+
+    return touched
+
+def list_markets(granularity='monthly', root=STORE_DIR):
+    """Markets present in the store for a granularity"""
+    base = os.path.join(root, f"granularity={granularity}")
+    if not os.path.isdir(base):
+        return []
+    return sorted(d.split('=', 1)[1] for d in os.listdir(base) if d.startswith('market='))
+
+def store_exists(root=STORE_DIR):
+    return os.path.isdir(root) and any(os.path.isdir(os.path.join(root, f"granularity={g}")) for g in GRANULARITIES)
@@ -0,0 +1,321 @@
+"""
+Tableau Export Pipeline
+Streaming CSV -> Tableau-ready CSV shared by the project prepare scripts
+(bali_analysis/scripts/prepare_tableau.py, web3_analysis/scripts/prepare_data.py).
+
+Sources are read in chunks, so memory stays flat however large the file is:
+column names are normalized once from the header, dates are formatted with a
+vectorized fast path (parse with an explicit ISO format, then datetime64[D] ->
+'YYYY-MM-DD' in numpy instead of a per-row strftime), derived fields are
+computed per chunk, and each chunk is appended to a temporary file that
+replaces the output only when the export finished.
+
+Date-ordered exports (sort_by) use an external merge sort, so they never hold
+more than about one chunk either:
+
+    1. each chunk is sorted on an int64 key and spilled to disk as a Parquet run
+       (key = day number << 40 | row number, so equal dates keep input order)
+    2. the runs are merged k ways, a batch at a time: every run contributes
+       its rows up to the smallest last key among the loaded batches
+    3. with more than MERGE_FAN_IN runs, groups of MERGE_FAN_IN runs are first
+       merged into longer runs (as many passes as needed), so no more than
+       MERGE_FAN_IN runs are ever open, each read in batches of
+       chunk_rows / MERGE_FAN_IN rows
+
+Runs are spilled next to the output file rather than to /tmp, which may be
+RAM-backed, and are removed once the merge finishes.
+
+    from tableau_export import export_csv
+
+    summary = export_csv(source, output, date_columns=['arrival_date'], derive=add_revenue,
+                         sort_by='arrival_date')
+
+Self-check (more runs than MERGE_FAN_IN, sparse text column):
+    python tableau_export.py
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 250_000
+DATE_FORMAT = '%Y-%m-%d'
+SORT_KEY = '_sort_key'
+_ROW_BITS = 40                 # row numbers in the low bits: < 2**40 rows per export
+_MISSING_DAY = 2 ** 22         # missing dates sort last
+MERGE_FAN_IN = 16              # runs merged at once
+
+def normalize_columns(columns):
+    """Tableau-friendly column names: spaces -> underscores, lower case"""
+    return pd.Index(columns).str.replace(' ', '_').str.lower()
+
+def column_dtypes(sample):
+    """One dtype per column, inferred from a sample chunk.
+
+    Integers and booleans become nullable (a gap in a later chunk doesn't turn
+    them into floats), and text or all-empty columns are read as text.
+    """
+    dtypes = {}
+    for column, dtype in sample.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            dtypes[column] = 'boolean'
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[column] = 'Int64'
+        elif pd.api.types.is_float_dtype(dtype) and sample[column].notna().any():
+            dtypes[column] = 'float64'
+        else:
+            dtypes[column] = 'str'
+    return dtypes
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS, **read_kwargs):
+    """Yield DataFrame chunks of a CSV with normalized column names.
+
+    Column dtypes are settled once from the first chunk (see column_dtypes;
+    a `dtype=` argument overrides them), so every chunk writes a column the
+    same way. Floats are parsed round-trip exact, so re-exported values keep
+    every digit.
+    """
+    columns = None
+    read_kwargs.setdefault('float_precision', 'round_trip')
+    sample = pd.read_csv(path, nrows=chunk_rows, **{k: v for k, v in read_kwargs.items() if k != 'dtype'})
+    read_kwargs['dtype'] = {**column_dtypes(sample), **(read_kwargs.get('dtype') or {})}
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, **read_kwargs):
+        if columns is None:
+            columns = normalize_columns(chunk.columns)
+        chunk.columns = columns
+        yield chunk
+
+def parse_dates(values):
+    """Parse a date column; ISO dates take the fast fixed-format path"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    try:
+        return pd.to_datetime(values, format='ISO8601')
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, format='mixed')
+
+def format_dates(values):
+    """Dates -> 'YYYY-MM-DD' strings (NaN where missing), vectorized in numpy"""
+    parsed = parse_dates(values)
+    days = parsed.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    text = days.astype(str).astype(object)
+    text[np.isnat(days)] = np.nan
+    return pd.Series(text, index=parsed.index)
+
+def append_csv(chunk, path, first):
+    """Write the first chunk with a header, append the rest"""
+    chunk.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+def _update_range(ranges, column, values):
+    values = values.dropna()
+    if values.empty:
+        return
+    low, high = values.min(), values.max()
+    current = ranges.get(column)
+    ranges[column] = (low, high) if current is None else (min(current[0], low), max(current[1], high))
+
+def transform_chunks(chunks, date_columns=(), derive=None, summary=None):
+    """Format date columns and apply `derive(chunk) -> chunk` to each chunk.
+
+    `summary`, if given, collects row counts and per-date-column (min, max).
+    """
+    for chunk in chunks:
+        for column in date_columns:
+            if column in chunk.columns:
+                chunk[column] = format_dates(chunk[column])
+                if summary is not None:
+                    _update_range(summary['date_range'], column, chunk[column])
+        if derive is not None:
+            chunk = derive(chunk)
+        if summary is not None:
+            summary['rows'] += len(chunk)
+        yield chunk
+
+def write_chunks(chunks, output):
+    """Stream chunks into `output` via a temp file; returns the number of chunks written"""
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tmp_path = output + '.tmp'
+    written = 0
+    try:
+        for chunk in chunks:
+            append_csv(chunk, tmp_path, first=written == 0)
+            written += 1
+        if written == 0:
+            open(tmp_path, 'w').close()
+        os.replace(tmp_path, output)
+    finally:
+        # A failed export leaves the previous output and no partial file
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+def date_keys(values, first_row=0):
+    """Unique int64 sort keys for a date column: day number, then row number (from `first_row`)"""
+    days = parse_dates(values).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    day_numbers = np.where(np.isnat(days), _MISSING_DAY, days.astype(np.int64))
+    return (day_numbers << _ROW_BITS) + first_row + np.arange(len(days), dtype=np.int64)
+
+def run_schema(table):
+    """Parquet schema every run is cast to: the first run's, with all-null columns as text"""
+    import pyarrow as pa
+
+    fields = [field.with_type(pa.large_string()) if pa.types.is_null(field.type) else field
+              for field in table.schema]
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+def spill_runs(chunks, sort_by, spill_dir):
+    """Sort each chunk by its `sort_by` date and write it to `spill_dir` as a Parquet run.
+
+    All runs share one schema (see run_schema), so merging them never has to
+    reconcile column types. Returns (run paths in input order, an empty frame
+    with the chunks' columns or None if there were no chunks). A chunk without
+    the column keeps its row order.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    runs, rows, header, schema = [], 0, None, None
+    for chunk in chunks:
+        if header is None:
+            header = chunk.iloc[0:0]
+        if chunk.empty:
+            continue
+        if sort_by in chunk.columns:
+            keys = date_keys(chunk[sort_by], rows)
+        else:
+            keys = rows + np.arange(len(chunk), dtype=np.int64)
+        rows += len(chunk)
+        order = np.argsort(keys, kind='stable')
+        run = chunk.iloc[order]
+        run.insert(0, SORT_KEY, keys[order])
+        table = pa.Table.from_pandas(run, preserve_index=False)
+        if schema is None:
+            schema = run_schema(table)
+        path = os.path.join(spill_dir, f'run_{len(runs):05d}.parquet')
+        pq.write_table(table.cast(schema), path)
+        runs.append(path)
+    return runs, header
+
+def _merge_group(runs, chunk_rows):
+    """K-way merge of sorted runs, yielding chunks (key column included) in key order"""
+    import pyarrow.parquet as pq
+
+    batch_rows = max(1, chunk_rows // max(1, len(runs)))
+    readers = [pq.ParquetFile(path).iter_batches(batch_size=batch_rows) for path in runs]
+    buffers = {}
+
+    def load(i):
+        batch = next(readers[i], None)
+        if batch is None:
+            buffers.pop(i, None)
+        else:
+            buffers[i] = batch.to_pandas()
+
+    for i in range(len(readers)):
+        load(i)
+    while buffers:
+        # Rows up to the smallest last key can't be preceded by anything not yet loaded
+        bound = min(block[SORT_KEY].iat[-1] for block in buffers.values())
+        parts = []
+        for i, block in list(buffers.items()):
+            cut = int(np.searchsorted(block[SORT_KEY].to_numpy(), bound, side='right'))
+            if cut:
+                parts.append(block.iloc[:cut])
+            if cut == len(block):
+                load(i)
+            elif cut:
+                buffers[i] = block.iloc[cut:]
+        yield pd.concat(parts, ignore_index=True).sort_values(SORT_KEY, kind='stable')
+
+def _write_run(chunks, runs, path):
+    """Stream merged chunks into one Parquet run with the runs' (shared) schema"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(runs[0])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    return path
+
+def merge_runs(runs, chunk_rows=CHUNK_ROWS, fan_in=MERGE_FAN_IN):
+    """Merge sorted runs, yielding chunks in key order.
+
+    While there are more than `fan_in` runs, groups of `fan_in` are merged
+    into longer runs on disk, so at most `fan_in` runs are open at once and the
+    merge holds about one chunk in memory however many runs there are.
+    """
+    runs, level = list(runs), 0
+    while len(runs) > fan_in:
+        merged = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            path = os.path.join(os.path.dirname(group[0]), f'merge_{level}_{start // fan_in:05d}.parquet')
+            merged.append(_write_run(_merge_group(group, chunk_rows), group, path))
+            for run in group:
+                os.remove(run)
+        runs, level = merged, level + 1
+    for chunk in _merge_group(runs, chunk_rows):
+        yield chunk.drop(columns=SORT_KEY)
+
+def external_sort(chunks, sort_by, chunk_rows=CHUNK_ROWS, spill_dir=None):
+    """Yield the rows of `chunks` stable-sorted by the `sort_by` date, spilling sorted runs to disk"""
+    with tempfile.TemporaryDirectory(prefix='.sort-', dir=spill_dir) as tmp:
+        runs, header = spill_runs(chunks, sort_by, tmp)
+        if not runs:
+            # No rows: still write the header, as the unsorted export does
+            if header is not None:
+                yield header
+            return
+        yield from merge_runs(runs, chunk_rows)
+
+def export_csv(source, output, date_columns=(), derive=None, sort_by=None, chunk_rows=CHUNK_ROWS):
+    """Chunked Tableau export of `source` to `output`.
+
+    With `sort_by` (a date column), rows are written in date order via an
+    external merge sort, stable for equal dates and with missing dates last.
+    Returns {'rows': int, 'date_range': {column: (min, max)}}.
+    """
+    summary = {'rows': 0, 'date_range': {}}
+    chunks = transform_chunks(read_chunks(source, chunk_rows), date_columns, derive, summary)
+    if sort_by is not None:
+        spill_dir = os.path.dirname(os.path.abspath(output))
+        os.makedirs(spill_dir, exist_ok=True)
+        chunks = external_sort(chunks, sort_by, chunk_rows, spill_dir)
+    write_chunks(chunks, output)
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Self-check: external sort with more runs than MERGE_FAN_IN")
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--chunk-rows', type=int, default=1_000)
+    args = parser.parse_args()
+
+    # Sparse text column: empty in whole chunks, text in others (and an
+    # integer column with gaps), so per-chunk inference would disagree
+    rng = np.random.default_rng(0)
+    days = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, args.rows), unit='D')
+    source = pd.DataFrame({'Arrival Date': days.strftime(DATE_FORMAT),
+                           'Nights': pd.array(rng.integers(1, 15, args.rows), dtype='Int64'),
+                           'Agent': pd.array([None] * args.rows, dtype=object)})
+    source.loc[rng.choice(args.rows, 50, replace=False), 'Agent'] = 'agent_9'
+    source.loc[:args.chunk_rows * 2, 'Agent'] = None
+    source.loc[rng.choice(args.rows, 50, replace=False), 'Nights'] = pd.NA
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path, output = os.path.join(tmp, 'source.csv'), os.path.join(tmp, 'sorted.csv')
+        source.to_csv(source_path, index=False)
+        runs = -(-args.rows // args.chunk_rows)
+        print(f"🔀 Sorting {args.rows:,} rows in {runs} runs (fan-in {MERGE_FAN_IN})...")
+        export_csv(source_path, output, date_columns=['arrival_date'], sort_by='arrival_date',
+                   chunk_rows=args.chunk_rows)
+
+        expected = source.sort_values('Arrival Date', kind='stable')
+        expected.columns = normalize_columns(expected.columns)
+        with open(output) as f:
+            assert f.read() == expected.to_csv(index=False), "external sort differs from an in-memory sort"
+    print("✅ External sort matches an in-memory stable sort")
@@ -2,8 +2,8 @@
 Web3 Uniswap Analysis: Generate cleaned data and Tableau export
 """
 
-import pandas as pd
 import os
+import sys
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,34 +12,42 @@ RAW_DATA = os.path.join(PROJECT_ROOT, '01_raw_data', 'uniswap_sample_data.csv')
 CLEANED_DATA = os.path.join(PROJECT_ROOT, '02_cleaned_data', 'uniswap_cleaned.csv')
 TABLEAU_OUTPUT = os.path.join(PROJECT_ROOT, '04_tableau', 'uniswap_tableau.csv')
 
+sys.path.insert(0, os.path.dirname(PROJECT_ROOT))
+from instrumentation import instrument
+from tableau_export import append_csv, read_chunks, transform_chunks, write_chunks
+
+@instrument('prepare')
 def clean_and_prepare():
     """Clean raw data and create Tableau export"""
     print("📂 Loading raw Uniswap data...")
     
-    df = pd.read_csv(RAW_DATA)
-    print(f"Original records: {len(df):,}")
-    
-    # Clean data
-    df_clean = df.copy()
-    df_clean.columns = df_clean.columns.str.replace(' ', '_').str.lower()
-    
-    # Save cleaned version
-    df_clean.to_csv(CLEANED_DATA, index=False)
+    # One streaming pass: every cleaned chunk (normalized column names) goes to
+    # the cleaned file, then gets its dates formatted for the Tableau file
+    summary = {'rows': 0, 'date_range': {}}
+    cleaned_tmp = CLEANED_DATA + '.tmp'
+
+    def cleaned_chunks():
+        first = True
+        for chunk in read_chunks(RAW_DATA):
+            append_csv(chunk, cleaned_tmp, first)
+            first = False
+            yield chunk
+        if first:
+            open(cleaned_tmp, 'w').close()
+
+    try:
+        write_chunks(transform_chunks(cleaned_chunks(), date_columns=['date'], summary=summary), TABLEAU_OUTPUT)
+        os.replace(cleaned_tmp, CLEANED_DATA)
+    finally:
+        # Never leave a partial cleaned file behind if the export failed
+        if os.path.exists(cleaned_tmp):
+            os.remove(cleaned_tmp)
+    print(f"Original records: {summary['rows']:,}")
     print(f"✅ Cleaned data saved: {CLEANED_DATA}")
-    
-    # Prepare Tableau version (aggregated)
-    tableau_df = df_clean.copy()
-    
-    # Format dates if they exist
-    if 'date' in tableau_df.columns:
-        tableau_df['date'] = pd.to_datetime(tableau_df['date']).dt.strftime('%Y-%m-%d')
-    
-    # Save Tableau version
-    tableau_df.to_csv(TABLEAU_OUTPUT, index=False)
     print(f"✅ Tableau file saved: {TABLEAU_OUTPUT}")
-    print(f"📊 Records: {len(tableau_df):,}")
+    print(f"📊 Records: {summary['rows']:,}")
     
-    return tableau_df
+    return summary
 
 if __name__ == "__main__":
     clean_and_prepare()